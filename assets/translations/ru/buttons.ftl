@@ -88,6 +88,8 @@ btn-statistics-current-page =
 
 # Users
 btn-users-search = 🔍 Поиск пользователя
+btn-users-search-previous = ⬅️ Назад
+btn-users-search-next = Далее ➡️
 btn-users-recent-registered = 🆕 Последние зарегистрированные
 btn-users-recent-activity = 📝 Последние взаимодействующие
 btn-users-blacklist = 🚫 Черный список
@@ -226,6 +228,8 @@ btn-remnashop-plans = 📦 Планы
 btn-remnashop-notifications = 🔔 Уведомления
 btn-remnashop-logs = 📄 Логи
 btn-remnashop-audit = 🔍 Аудит
+btn-remnashop-cache = 🗄 Кэш
+btn-remnashop-cache-refresh = 🔄 Обновить
 
 
 # Gateways
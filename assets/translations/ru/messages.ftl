@@ -343,14 +343,7 @@ msg-users-search =
 msg-users-search-results =
     <b>🔍 Поиск пользователя</b>
 
-    Найдено <b>{ $count }</b> { $count ->
-    [one] пользователь
-    [few] пользователя
-    *[more] пользователей
-    }, { $count ->
-    [one] соответствующий
-    *[more] соответствующих
-    } запросу
+    Пользователи, соответствующие запросу, страница <b>{ $page }</b>
 
 msg-user-main = 
     <b>📝 Информация о пользователе</b>
@@ -678,6 +671,23 @@ msg-remnawave-inbounds =
 msg-remnashop-main = <b>🛍 RemnaShop v{ $version }</b>
 msg-admins-main = <b>👮‍♂️ Администраторы</b>
 
+msg-remnashop-cache =
+    <b>🗄 Кэш</b>
+
+    { $prefixes }
+
+msg-remnashop-cache-prefix =
+    <b>{ $prefix }:</b> { $hit_ratio }%
+    <blockquote>
+    • <b>Попадания</b>: { $hits } (локальные: { $local_hits })
+    • <b>Промахи</b>: { $misses }
+    • <b>Ошибки записи</b>: { $write_failures }
+    • <b>Ошибки декодирования</b>: { $decode_failures }
+
+    • <b>Функция</b>: { $func_avg } мс (p95 ≤ { $func_p95 } мс)
+    • <b>Redis</b>: { $redis_avg } мс (p95 ≤ { $redis_p95 } мс)
+    </blockquote>
+
 
 # Gateways
 msg-gateways-main = <b>🌐 Платежные системы</b>
@@ -0,0 +1,97 @@
+# Compares cache serializers used by `redis_cache` for user payloads.
+# Requires a configured .env (DTO modules load AppConfig), run from the project root:
+#   uv run python -m benchmarks.cache_serializers
+
+import timeit
+from datetime import timedelta
+from typing import Any, Callable, Final
+from uuid import uuid4
+
+from remnapy.enums import TrafficLimitStrategy
+
+from src.core.enums import PlanType, SubscriptionStatus
+from src.core.utils.time import datetime_now
+from src.infrastructure.database.models.dto import (
+    BaseSubscriptionDto,
+    PlanSnapshotDto,
+    UserDto,
+)
+from src.infrastructure.redis.serializers import (
+    CacheSerializer,
+    JsonCacheSerializer,
+    MsgpackCacheSerializer,
+)
+
+NUMBER: Final[int] = 2_000
+LIST_SIZE: Final[int] = 100
+
+
+def make_user(telegram_id: int) -> UserDto:
+    now = datetime_now()
+    plan = PlanSnapshotDto(
+        id=1,
+        name="Premium",
+        tag="PREMIUM",
+        type=PlanType.BOTH,
+        traffic_limit=100,
+        device_limit=3,
+        duration=30,
+        traffic_limit_strategy=TrafficLimitStrategy.MONTH,
+        internal_squads=[uuid4(), uuid4()],
+        external_squad=uuid4(),
+    )
+    subscription = BaseSubscriptionDto(
+        id=telegram_id,
+        user_remna_id=uuid4(),
+        status=SubscriptionStatus.ACTIVE,
+        traffic_limit=100,
+        device_limit=3,
+        traffic_limit_strategy=TrafficLimitStrategy.MONTH,
+        internal_squads=plan.internal_squads,
+        external_squad=plan.external_squad,
+        expire_at=now + timedelta(days=30),
+        url="https://example.com/sub/abcdef",
+        plan=plan,
+        created_at=now,
+        updated_at=now,
+    )
+    return UserDto(
+        id=telegram_id,
+        telegram_id=telegram_id,
+        username=f"user{telegram_id}",
+        referral_code=f"ref{telegram_id}",
+        name=f"User {telegram_id}",
+        current_subscription=subscription,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def measure(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER * 1_000_000
+
+
+def run(name: str, serializer: CacheSerializer, value: Any) -> None:
+    data = serializer.dumps(value)
+    assert serializer.loads(data) == value
+
+    encode_us = measure(lambda: serializer.dumps(value))
+    decode_us = measure(lambda: serializer.loads(data))
+    print(f"{name:<32} {len(data):>8} B {encode_us:>10.1f} us {decode_us:>10.1f} us")
+
+
+def main() -> None:
+    user = make_user(1)
+    users = [make_user(i) for i in range(LIST_SIZE)]
+
+    print(f"{'serializer':<32} {'size':>10} {'encode':>13} {'decode':>13}")
+    for payload_name, return_type, value in (
+        ("UserDto", UserDto, user),
+        (f"list[UserDto] x{LIST_SIZE}", list[UserDto], users),
+    ):
+        run(f"json / {payload_name}", JsonCacheSerializer(return_type), value)
+        run(f"msgpack / {payload_name}", MsgpackCacheSerializer(return_type), value)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Compares per-query Python overhead of statements built on every call and prebuilt ones.
+# Only the work done before a query reaches the driver is measured, no database is needed:
+#   uv run python -m benchmarks.repository_statements
+
+import timeit
+from typing import Any, Callable, Final
+from uuid import uuid4
+
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+
+from src.infrastructure.database.models.sql import Subscription, Transaction, User
+from src.infrastructure.database.repositories.subscription import SUBSCRIPTION_BY_ID
+from src.infrastructure.database.repositories.transaction import TRANSACTION_BY_PAYMENT_ID
+from src.infrastructure.database.repositories.user import (
+    USER_BY_TELEGRAM_ID,
+    USER_LOAD_PROFILES,
+)
+
+NUMBER: Final[int] = 20_000
+
+DIALECT: Final[PGDialect_asyncpg] = PGDialect_asyncpg()
+
+
+def measure(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER * 1_000_000
+
+
+def prepare(statement: Select[Any], cache: dict[Any, Any]) -> None:
+    # What Session.execute does before the driver: cache key lookup, compile only on a miss
+    cache_key = statement._generate_cache_key()
+    if cache_key not in cache:
+        cache[cache_key] = statement.compile(dialect=DIALECT)
+
+
+def run(name: str, build: Callable[[], Select[Any]], prebuilt: Select[Any]) -> None:
+    cache: dict[Any, Any] = {}
+    built_us = measure(lambda: prepare(build(), cache))
+    prebuilt_us = measure(lambda: prepare(prebuilt, cache))
+    speedup = built_us / prebuilt_us
+    print(f"{name:<40} {built_us:>10.1f} us {prebuilt_us:>10.1f} us {speedup:>7.1f}x")
+
+
+def main() -> None:
+    payment_id = uuid4()
+
+    print(f"{'query':<40} {'built':>13} {'prebuilt':>13} {'speedup':>8}")
+    for profile in USER_LOAD_PROFILES:
+        run(
+            f"users.get (profile={profile})",
+            lambda: select(User)
+            .where(User.telegram_id == 1)
+            .options(*USER_LOAD_PROFILES[profile]),  # noqa: B023
+            USER_BY_TELEGRAM_ID[profile],
+        )
+    run(
+        "subscriptions.get",
+        lambda: select(Subscription).where(Subscription.id == 1),
+        SUBSCRIPTION_BY_ID,
+    )
+    run(
+        "transactions.get",
+        lambda: select(Transaction).where(Transaction.payment_id == payment_id),
+        TRANSACTION_BY_PAYMENT_ID,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import hmac
+from typing import Optional
+
+from dishka import FromDishka
+from dishka.integrations.fastapi import inject
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from src.core.config import AppConfig
+from src.core.constants import API_V1, METRICS_PATH
+from src.infrastructure.database.metrics import database_metrics
+from src.infrastructure.redis.metrics import cache_metrics
+
+router = APIRouter(prefix=API_V1)
+
+
+@router.get(METRICS_PATH, response_class=PlainTextResponse)
+@inject
+async def metrics(
+    config: FromDishka[AppConfig],
+    authorization: Optional[str] = Header(default=None),
+) -> str:
+    # Served on the public webhook app, so it stays hidden until a token is configured
+    if config.metrics_token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    expected = f"Bearer {config.metrics_token.get_secret_value()}"
+    if not hmac.compare_digest((authorization or "").encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return cache_metrics.render_prometheus() + database_metrics.render_prometheus()
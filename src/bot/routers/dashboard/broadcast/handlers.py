@@ -288,13 +288,13 @@ async def on_send(
         raise ValueError("BroadcastAudience not found in dialog data")
 
     if is_double_click(dialog_manager, key="broadcast_confirm", cooldown=10):
-        users = await broadcast_service.get_audience_users(audience, plan_id=plan_id)
+        total_count = await broadcast_service.get_audience_count(audience, plan_id=plan_id)
 
         task_id = uuid.uuid4()
         broadcast = BroadcastDto(
             task_id=task_id,
             status=BroadcastStatus.PROCESSING,
-            total_count=len(users),
+            total_count=total_count,
             audience=audience,
             payload=payload,
         )
@@ -303,7 +303,7 @@ async def on_send(
         task = (
             await send_broadcast_task.kicker()
             .with_task_id(str(task_id))
-            .kiq(broadcast, users, payload)
+            .kiq(broadcast, audience, plan_id, payload)
         )
 
         dialog_manager.dialog_data["task_id"] = task.task_id
@@ -16,7 +16,7 @@ from src.bot.states import (
 from src.bot.widgets import Banner, I18nFormat, IgnoreUpdate
 from src.core.enums import BannerName
 
-from .getters import admins_getter, remnashop_getter
+from .getters import admins_getter, cache_getter, remnashop_getter
 from .handlers import on_logs_request, on_user_role_remove, on_user_select
 
 remnashop = Window(
@@ -74,6 +74,13 @@ remnashop = Window(
             on_click=show_dev_popup,
         ),
     ),
+    Row(
+        SwitchTo(
+            text=I18nFormat("btn-remnashop-cache"),
+            id="cache",
+            state=DashboardRemnashop.CACHE,
+        ),
+    ),
     Row(
         Start(
             text=I18nFormat("btn-back"),
@@ -122,7 +129,31 @@ admins = Window(
     getter=admins_getter,
 )
 
+cache = Window(
+    Banner(BannerName.DASHBOARD),
+    I18nFormat("msg-remnashop-cache"),
+    Row(
+        SwitchTo(
+            text=I18nFormat("btn-remnashop-cache-refresh"),
+            id="refresh",
+            state=DashboardRemnashop.CACHE,
+        ),
+    ),
+    Row(
+        Start(
+            text=I18nFormat("btn-back"),
+            id="back",
+            state=DashboardRemnashop.MAIN,
+            mode=StartMode.RESET_STACK,
+        ),
+    ),
+    IgnoreUpdate(),
+    state=DashboardRemnashop.CACHE,
+    getter=cache_getter,
+)
+
 router = Dialog(
     remnashop,
     admins,
+    cache,
 )
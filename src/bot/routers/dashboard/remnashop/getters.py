@@ -3,11 +3,14 @@ from typing import Any
 from aiogram_dialog import DialogManager
 from dishka import FromDishka
 from dishka.integrations.aiogram_dialog import inject
+from fluentogram import TranslatorRunner
 
 from src.__version__ import __version__
 from src.core.config import AppConfig
 from src.core.enums import UserRole
+from src.core.utils.formatters import format_percent
 from src.infrastructure.database.models.dto import UserDto
+from src.infrastructure.redis.metrics import cache_metrics
 from src.services.user import UserService
 
 
@@ -42,3 +45,33 @@ async def admins_getter(
     ]
 
     return {"admins": users_dicts}
+
+
+@inject
+async def cache_getter(
+    dialog_manager: DialogManager,
+    i18n: FromDishka[TranslatorRunner],
+    **kwargs: Any,
+) -> dict[str, Any]:
+    prefixes = [
+        i18n.get(
+            "msg-remnashop-cache-prefix",
+            prefix=prefix,
+            hit_ratio=format_percent(
+                stats.hits + stats.local_hits,
+                stats.hits + stats.local_hits + stats.misses,
+            ),
+            hits=stats.hits,
+            local_hits=stats.local_hits,
+            misses=stats.misses,
+            write_failures=stats.write_failures,
+            decode_failures=stats.decode_failures,
+            func_avg=f"{stats.func_latency.average * 1000:.1f}",
+            func_p95=f"{stats.func_latency.quantile(0.95) * 1000:.1f}",
+            redis_avg=f"{stats.redis_latency.average * 1000:.1f}",
+            redis_p95=f"{stats.redis_latency.quantile(0.95) * 1000:.1f}",
+        )
+        for prefix, stats in cache_metrics.snapshot().items()
+    ]
+
+    return {"prefixes": "\n".join(prefixes) or "-"}
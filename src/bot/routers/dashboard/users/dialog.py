@@ -1,6 +1,14 @@
 from aiogram_dialog import Dialog, StartMode, Window
 from aiogram_dialog.widgets.input import MessageInput
-from aiogram_dialog.widgets.kbd import Button, Row, ScrollingGroup, Select, Start, SwitchTo
+from aiogram_dialog.widgets.kbd import (
+    Button,
+    Column,
+    Row,
+    ScrollingGroup,
+    Select,
+    Start,
+    SwitchTo,
+)
 from aiogram_dialog.widgets.text import Format
 from magic_filter import F
 
@@ -15,7 +23,13 @@ from .getters import (
     recent_registered_getter,
     search_results_getter,
 )
-from .handlers import on_unblock_all, on_user_search, on_user_select
+from .handlers import (
+    on_search_page_next,
+    on_search_page_previous,
+    on_unblock_all,
+    on_user_search,
+    on_user_select,
+)
 
 users = Window(
     Banner(BannerName.DASHBOARD),
@@ -136,20 +150,30 @@ recent_activity = Window(
 
 search_results = Window(
     Banner(BannerName.DASHBOARD),
-    I18nFormat("msg-users-search-results", count=F["count"]),
-    ScrollingGroup(
+    I18nFormat("msg-users-search-results", page=F["page"]),
+    Column(
         Select(
-            text=Format("{item.telegram_id} ({item.name})"),
+            text=Format("{item[telegram_id]} ({item[name]})"),
             id="user",
-            item_id_getter=lambda item: item.telegram_id,
+            item_id_getter=lambda item: item["telegram_id"],
             items="found_users",
             type_factory=int,
             on_click=on_user_select,
         ),
-        id="scroll",
-        width=1,
-        height=7,
-        hide_on_single_page=True,
+    ),
+    Row(
+        Button(
+            text=I18nFormat("btn-users-search-previous"),
+            id="previous",
+            on_click=on_search_page_previous,
+            when=F["has_previous"],
+        ),
+        Button(
+            text=I18nFormat("btn-users-search-next"),
+            id="next",
+            on_click=on_search_page_next,
+            when=F["has_next"],
+        ),
     ),
     Row(
         SwitchTo(
@@ -1,4 +1,4 @@
-from typing import Any, cast
+from typing import Any, Optional, cast
 
 from aiogram_dialog import DialogManager
 from dishka import FromDishka
@@ -9,16 +9,41 @@ from src.infrastructure.database.models.dto import UserDto
 from src.services.user import UserService
 
 
-async def search_results_getter(dialog_manager: DialogManager, **kwargs: Any) -> dict[str, Any]:
+@inject
+async def search_results_getter(
+    dialog_manager: DialogManager,
+    user_service: FromDishka[UserService],
+    **kwargs: Any,
+) -> dict[str, Any]:
     start_data = cast(dict[str, Any], dialog_manager.start_data)
-    found_users_data: list[str] = start_data["found_users"]
-    found_users: list[UserDto] = [
-        UserDto.model_validate_json(json_string) for json_string in found_users_data
-    ]
+    dialog_data = dialog_manager.dialog_data
+    page: int = dialog_data.get("page", 0)
+    # Keyset cursors of the pages visited so far, the first page starts without one
+    cursors: list[Optional[list[Any]]] = dialog_data.setdefault("cursors", start_data["cursors"])
+    dialog_data.setdefault("results", start_data["results"])
+
+    # Results of the current page are kept, the search only runs when the page moves
+    if dialog_data.get("results_page", 0) != page:
+        cursor = cursors[page]
+        found_users, next_cursor = await user_service.search_by_name(
+            query=start_data["query"],
+            after=(cursor[0], cursor[1]) if cursor else None,
+        )
+
+        del cursors[page + 1 :]
+        if next_cursor:
+            cursors.append(list(next_cursor))
+
+        dialog_data["results"] = [
+            user.model_dump(include={"telegram_id", "name"}) for user in found_users
+        ]
+        dialog_data["results_page"] = page
 
     return {
-        "found_users": found_users,
-        "count": len(found_users),
+        "found_users": dialog_data["results"],
+        "page": page + 1,
+        "has_previous": page > 0,
+        "has_next": len(cursors) > page + 1,
     }
 
 
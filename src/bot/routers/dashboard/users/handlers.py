@@ -32,7 +32,7 @@ async def on_user_search(
     if not user.is_privileged:
         return
 
-    found_users = await user_service.search_users(message)
+    found_users, next_cursor = await user_service.search_users(message)
     search_query = message.text.strip() if message.text else None
 
     if not found_users:
@@ -50,9 +50,16 @@ async def on_user_search(
             f"{log(user)} Search for '{search_query}' "
             f"found '{len(found_users)}' results. Proceeding to selection state"
         )
+        # The first page is handed over, the results window doesn't search it again
         await dialog_manager.start(
             state=DashboardUsers.SEARCH_RESULTS,
-            data={"found_users": [found_user.model_dump_json() for found_user in found_users]},
+            data={
+                "query": search_query,
+                "results": [
+                    user.model_dump(include={"telegram_id", "name"}) for user in found_users
+                ],
+                "cursors": [None, list(next_cursor)] if next_cursor else [None],
+            },
         )
 
 
@@ -68,6 +75,22 @@ async def on_user_select(
     await start_user_window(manager=dialog_manager, target_telegram_id=selected_user)
 
 
+async def on_search_page_next(
+    callback: CallbackQuery,
+    widget: Button,
+    dialog_manager: DialogManager,
+) -> None:
+    dialog_manager.dialog_data["page"] = dialog_manager.dialog_data.get("page", 0) + 1
+
+
+async def on_search_page_previous(
+    callback: CallbackQuery,
+    widget: Button,
+    dialog_manager: DialogManager,
+) -> None:
+    dialog_manager.dialog_data["page"] = max(dialog_manager.dialog_data.get("page", 0) - 1, 0)
+
+
 @inject
 async def on_unblock_all(
     callback: CallbackQuery,
@@ -100,6 +100,7 @@ class DashboardRemnashop(StatesGroup):
     MAIN = State()
     ADMINS = State()
     ADVERTISING = State()
+    CACHE = State()
 
 
 class RemnashopReferral(StatesGroup):
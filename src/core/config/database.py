@@ -18,15 +18,32 @@ class DatabaseConfig(BaseConfig, env_prefix="DATABASE_"):
     max_overflow: int = 30
     pool_timeout: int = 10
     pool_recycle: int = 3600
+    query_cache_size: int = 1200
+    prepared_statement_cache_size: int = 500
+
+    replica_hosts: list[str] = []
 
     @property
     def dsn(self) -> str:
+        return self._build_dsn(self.host, self.port)
+
+    @property
+    def replica_dsns(self) -> list[str]:
+        dsns = []
+
+        for replica in self.replica_hosts:
+            host, _, port = replica.partition(":")
+            dsns.append(self._build_dsn(host, int(port) if port else self.port))
+
+        return dsns
+
+    def _build_dsn(self, host: str, port: int) -> str:
         return PostgresDsn.build(
             scheme="postgresql+asyncpg",
             username=self.user,
             password=self.password.get_secret_value(),
-            host=self.host,
-            port=self.port,
+            host=host,
+            port=port,
             path=self.name,
         ).unicode_string()
 
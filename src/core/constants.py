@@ -19,6 +19,7 @@ API_V1: Final[str] = "/api/v1"
 BOT_WEBHOOK_PATH: Final[str] = "/telegram"
 PAYMENTS_WEBHOOK_PATH: Final[str] = "/payments"
 REMNAWAVE_WEBHOOK_PATH: Final[str] = "/remnawave"
+METRICS_PATH: Final[str] = "/metrics"
 REPOSITORY: Final[str] = "https://github.com/snoups/remnashop"
 
 TIMEZONE: Final[timezone] = timezone.utc
@@ -40,8 +41,25 @@ TIME_1M: Final[int] = 60
 TIME_5M: Final[int] = TIME_1M * 5
 TIME_10M: Final[int] = TIME_1M * 10
 
+CACHE_LOCAL_MAXSIZE: Final[int] = 10_000
+SETTINGS_REVALIDATE_INTERVAL: Final[int] = 5
+SETTINGS_MAX_STALENESS: Final[int] = 30
+
 RECENT_REGISTERED_MAX_COUNT: Final[int] = 25
 RECENT_ACTIVITY_MAX_COUNT: Final[int] = 25
+USER_SEARCH_PAGE_SIZE: Final[int] = 10
 
 BATCH_SIZE: Final[int] = 20
 BATCH_DELAY: Final[int] = 1
+AUDIENCE_CHUNK_SIZE: Final[int] = 1000
+SYNC_CHUNK_SIZE: Final[int] = 500
+BROADCAST_BATCH_SIZE: Final[int] = 20
+BROADCAST_FLUSH_SIZE: Final[int] = 500
+BROADCAST_FLUSH_INTERVAL: Final[int] = 5
+
+STATISTICS_ROLLUP_OVERLAP: Final[int] = TIME_5M
+STATISTICS_REROLL_DAYS: Final[int] = 30
+
+MAINTENANCE_CHUNK_SIZE: Final[int] = 1000
+TRANSACTION_PENDING_TIMEOUT: Final[int] = TIME_1M * 30
+BROADCAST_RETENTION_DAYS: Final[int] = 7
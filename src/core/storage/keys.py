@@ -12,7 +12,10 @@ class LastNotifiedVersionKey(StorageKey, prefix="last_notified_version"): ...
 class SyncRunningKey(StorageKey, prefix="sync_running"): ...
 
 
+class SettingsVersionKey(StorageKey, prefix="settings_version"): ...
+
+
 class AccessWaitListKey(StorageKey, prefix="access_wait_list"): ...
 
 
-class RecentActivityUsersKey(StorageKey, prefix="recent_activity_users"): ...
+class RecentActivityUsersKey(StorageKey, prefix="recent_activity"): ...
@@ -1,5 +1,9 @@
+from .identity_map import IdentityMap
+from .replicas import ReadReplicas
 from .uow import UnitOfWork
 
 __all__ = [
+    "IdentityMap",
+    "ReadReplicas",
     "UnitOfWork",
 ]
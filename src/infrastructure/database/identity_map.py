@@ -0,0 +1,27 @@
+from typing import Any, Final, Hashable, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+MISSING: Final[Any] = object()
+
+
+class IdentityMap:
+    _entries: dict[tuple[type, Hashable], Any]
+
+    def __init__(self) -> None:
+        self._entries = {}
+
+    def has(self, model: type[T], key: Hashable) -> bool:
+        return (model, key) in self._entries
+
+    def get(self, model: type[T], key: Hashable) -> Optional[T]:
+        return self._entries.get((model, key))  # type: ignore[no-any-return]
+
+    def set(self, model: type[T], key: Hashable, value: Optional[T]) -> None:
+        self._entries[(model, key)] = value
+
+    def discard(self, model: type[T], key: Hashable) -> None:
+        if self._entries.pop((model, key), MISSING) is not MISSING:
+            logger.debug(f"Identity map entry '{model.__name__}:{key}' discarded")
@@ -0,0 +1,34 @@
+class DatabaseMetrics:
+    units_of_work: int
+    sessions_opened: int
+    replica_sessions_opened: int
+    commits: int
+    commits_skipped: int
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.units_of_work = 0
+        self.sessions_opened = 0
+        self.replica_sessions_opened = 0
+        self.commits = 0
+        self.commits_skipped = 0
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+
+        for name, value in (
+            ("database_units_of_work_total", self.units_of_work),
+            ("database_sessions_opened_total", self.sessions_opened),
+            ("database_replica_sessions_opened_total", self.replica_sessions_opened),
+            ("database_commits_total", self.commits),
+            ("database_commits_skipped_total", self.commits_skipped),
+        ):
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+database_metrics = DatabaseMetrics()
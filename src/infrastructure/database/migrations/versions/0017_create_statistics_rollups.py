@@ -0,0 +1,77 @@
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0017"
+down_revision: Union[str, None] = "0016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_SOURCES: tuple[str, ...] = ("users", "subscriptions", "transactions", "referral_rewards")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_statistics",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("new_users", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("new_subscriptions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("new_trials", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("active_subscriptions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("expired_subscriptions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("trial_subscriptions", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "daily_revenue",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("currency", postgresql.ENUM(name="currency", create_type=False), nullable=False),
+        sa.Column(
+            "gateway_type",
+            postgresql.ENUM(name="payment_gateway_type", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("completed_transactions", sa.Integer(), nullable=False),
+        sa.Column("paid_transactions", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(), nullable=False),
+        sa.Column("discounts", sa.Numeric(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "currency", "gateway_type"),
+    )
+    op.create_table(
+        "daily_referral_rewards",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "type",
+            postgresql.ENUM(name="referral_reward_type", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("rewards_count", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "type"),
+    )
+    op.create_table(
+        "statistics_watermarks",
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("value", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("source"),
+    )
+
+    # The rollup job finds changed rows by `updated_at` and recomputes their days
+    for table in ROLLUP_SOURCES:
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+        op.execute(
+            f"CREATE INDEX ix_{table}_created_day ON {table} ((timezone('UTC', created_at)::date))"
+        )
+
+
+def downgrade() -> None:
+    for table in ROLLUP_SOURCES:
+        op.drop_index(f"ix_{table}_created_day", table_name=table)
+        op.drop_index(f"ix_{table}_updated_at", table_name=table)
+
+    op.drop_table("statistics_watermarks")
+    op.drop_table("daily_referral_rewards")
+    op.drop_table("daily_revenue")
+    op.drop_table("daily_statistics")
@@ -0,0 +1,34 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0018"
+down_revision: Union[str, None] = "0017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS: tuple[str, ...] = ("name", "username")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Serve both `LIKE '%q%'` and trigram similarity lookups of the dashboard search.
+    # Built concurrently so writes to users aren't blocked, which needs autocommit
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_{column}_trgm "
+                f"ON users USING gin (lower({column}) gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.drop_index(
+                f"ix_users_{column}_trgm",
+                table_name="users",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
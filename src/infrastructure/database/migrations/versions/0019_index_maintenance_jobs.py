@@ -0,0 +1,25 @@
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0019"
+down_revision: Union[str, None] = "0018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pending transactions are a small slice of the table, scanned by age every 30 minutes
+    op.create_index(
+        "ix_transactions_pending_created_at",
+        "transactions",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index("ix_broadcasts_created_at", "broadcasts", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broadcasts_created_at", table_name="broadcasts")
+    op.drop_index("ix_transactions_pending_created_at", table_name="transactions")
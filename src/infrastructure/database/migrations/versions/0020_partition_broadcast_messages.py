@@ -0,0 +1,65 @@
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0020"
+down_revision: Union[str, None] = "0019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS: str = "id, broadcast_id, user_id, message_id, status"
+
+
+def _create_table(name: str, primary_key: str, partition_by: str = "") -> None:
+    op.execute(
+        f"CREATE TABLE {name} ("
+        "id integer NOT NULL DEFAULT nextval('broadcast_messages_id_seq'), "
+        "broadcast_id integer NOT NULL REFERENCES broadcasts (id), "
+        "user_id bigint NOT NULL, "
+        "message_id bigint, "
+        "status broadcast_message_status NOT NULL, "
+        f"CONSTRAINT {name}_pkey PRIMARY KEY ({primary_key})"
+        f") {partition_by}"
+    )
+
+
+def _replace_table(primary_key: str, partition_by: str = "") -> None:
+    op.execute("ALTER TABLE broadcast_messages RENAME TO broadcast_messages_old")
+    op.execute(
+        "ALTER TABLE broadcast_messages_old "
+        "RENAME CONSTRAINT broadcast_messages_pkey TO broadcast_messages_old_pkey"
+    )
+    # The id sequence would otherwise be dropped together with the old table
+    op.execute("ALTER SEQUENCE broadcast_messages_id_seq OWNED BY NONE")
+    _create_table("broadcast_messages", primary_key, partition_by)
+    op.execute("ALTER SEQUENCE broadcast_messages_id_seq OWNED BY broadcast_messages.id")
+
+
+def upgrade() -> None:
+    # One partition per broadcast: retention detaches and drops whole partitions, reads are
+    # pruned by `broadcast_id` and walk the (broadcast_id, id) primary key. There is no default
+    # partition, it would block concurrent detaches
+    _replace_table("broadcast_id, id", "PARTITION BY RANGE (broadcast_id)")
+
+    broadcast_ids = op.get_bind().execute(
+        sa.text("SELECT DISTINCT broadcast_id FROM broadcast_messages_old")
+    )
+    for (broadcast_id,) in broadcast_ids.all():
+        op.execute(
+            f"CREATE TABLE broadcast_messages_{broadcast_id} PARTITION OF broadcast_messages "
+            f"FOR VALUES FROM ({broadcast_id}) TO ({broadcast_id + 1})"
+        )
+
+    op.execute(
+        f"INSERT INTO broadcast_messages ({COLUMNS}) SELECT {COLUMNS} FROM broadcast_messages_old"
+    )
+    op.execute("DROP TABLE broadcast_messages_old")
+
+
+def downgrade() -> None:
+    _replace_table("id")
+    op.execute(
+        f"INSERT INTO broadcast_messages ({COLUMNS}) SELECT {COLUMNS} FROM broadcast_messages_old"
+    )
+    op.execute("DROP TABLE broadcast_messages_old")
@@ -0,0 +1,26 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0021"
+down_revision: Union[str, None] = "0020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PLAN_SNAPSHOT_TABLES: tuple[str, ...] = ("subscriptions", "transactions")
+
+
+def upgrade() -> None:
+    for table in PLAN_SNAPSHOT_TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN plan TYPE jsonb USING plan::jsonb")
+        # Must match `json_integer(<model>.plan, "id")` used by plan audiences and statistics
+        op.execute(
+            f"CREATE INDEX ix_{table}_plan_id_status "
+            f"ON {table} (((plan ->> 'id')::integer), status)"
+        )
+
+
+def downgrade() -> None:
+    for table in PLAN_SNAPSHOT_TABLES:
+        op.drop_index(f"ix_{table}_plan_id_status", table_name=table)
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN plan TYPE json USING plan::json")
@@ -2,13 +2,11 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Optional
 
-from src.core.utils.time import datetime_now
-
 if TYPE_CHECKING:
     from .plan import PlanSnapshotDto
     from .user import BaseUserDto
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
 
@@ -50,15 +48,6 @@ class BaseTransactionDto(TrackableDto):
     def is_completed(self) -> bool:
         return self.status == TransactionStatus.COMPLETED
 
-    @property
-    def has_old(self) -> bool:
-        if not self.created_at:
-            return False
-        return (
-            self.status == TransactionStatus.PENDING
-            and datetime_now() - self.created_at > timedelta(minutes=30)
-        )
-
 
 class TransactionDto(BaseTransactionDto):
     user: Optional["BaseUserDto"] = None
@@ -1,15 +1,13 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Final, Optional
 
 if TYPE_CHECKING:
-    from src.infrastructure.database.models.dto.base import SqlModel
-
     from .subscription import BaseSubscriptionDto
 
 from datetime import datetime
 
-from pydantic import Field, PrivateAttr
+from pydantic import Field
 
 from src.core.constants import REMNASHOP_PREFIX
 from src.core.enums import Locale, UserRole
@@ -17,6 +15,9 @@ from src.core.utils.time import datetime_now
 
 from .base import TrackableDto
 
+# Loaded as SQL expressions, never written back to the users table
+USER_QUERY_FIELDS: Final[frozenset[str]] = frozenset({"any_subscription", "invited"})
+
 
 class BaseUserDto(TrackableDto):
     id: Optional[int] = Field(default=None, frozen=True)
@@ -70,12 +71,15 @@ class BaseUserDto(TrackableDto):
 class UserDto(BaseUserDto):
     current_subscription: Optional["BaseSubscriptionDto"] = None
 
-    _is_invited_user: bool = PrivateAttr(default=False)
-    _has_any_subscription: bool = PrivateAttr(default=False)
+    # Computed by the query (see USER_LOAD_PROFILES), None when the profile doesn't load them
+    any_subscription: Optional[bool] = Field(default=None, frozen=True)
+    invited: Optional[bool] = Field(default=None, frozen=True)
 
     @property
     def is_invited_user(self) -> bool:
-        return self._is_invited_user
+        if self.invited is None:
+            raise ValueError(f"User '{self.telegram_id}' was loaded without the invited flag")
+        return self.invited
 
     @property
     def has_subscription(self) -> bool:
@@ -83,17 +87,13 @@ class UserDto(BaseUserDto):
 
     @property
     def has_any_subscription(self) -> bool:
-        return self._has_any_subscription
-
-    @classmethod  # Fuck it, the main thing is that it works
-    def from_model(
-        cls,
-        model_instance: Optional["SqlModel"],
-        *,
-        decrypt: bool = False,
-    ) -> Optional["UserDto"]:
-        dto = super().from_model(model_instance, decrypt=decrypt)
-        if dto and model_instance:
-            dto._has_any_subscription = bool(getattr(model_instance, "subscriptions", []))
-            dto._is_invited_user = bool(getattr(model_instance, "referral", None))
-        return dto
+        if self.any_subscription is None:
+            raise ValueError(
+                f"User '{self.telegram_id}' was loaded without the any subscription flag"
+            )
+        return self.any_subscription
+
+    def with_flags_of(self, user: "UserDto") -> "UserDto":
+        return self.model_copy(
+            update={"any_subscription": user.any_subscription, "invited": user.invited}
+        )
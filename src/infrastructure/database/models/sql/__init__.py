@@ -1,10 +1,17 @@
 from .base import BaseSql
 from .broadcast import Broadcast, BroadcastMessage
+from .expressions import json_integer
 from .payment_gateway import PaymentGateway
 from .plan import Plan, PlanDuration, PlanPrice
 from .promocode import Promocode, PromocodeActivation
 from .referral import Referral, ReferralReward
 from .settings import Settings
+from .statistics import (
+    DailyReferralRewards,
+    DailyRevenue,
+    DailyStatistics,
+    StatisticsWatermark,
+)
 from .subscription import Subscription
 from .transaction import Transaction
 from .user import User
@@ -13,6 +20,9 @@ __all__ = [
     "BaseSql",
     "Broadcast",
     "BroadcastMessage",
+    "DailyReferralRewards",
+    "DailyRevenue",
+    "DailyStatistics",
     "PaymentGateway",
     "Plan",
     "PlanDuration",
@@ -22,7 +32,9 @@ __all__ = [
     "Referral",
     "ReferralReward",
     "Settings",
+    "StatisticsWatermark",
     "Subscription",
     "Transaction",
     "User",
+    "json_integer",
 ]
@@ -45,16 +45,21 @@ class Broadcast(BaseSql, TimestampMixin):
     messages: Mapped[list["BroadcastMessage"]] = relationship(
         back_populates="broadcast",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
 class BroadcastMessage(BaseSql):
     __tablename__ = "broadcast_messages"
+    __table_args__ = {"postgresql_partition_by": "RANGE (broadcast_id)"}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
-    broadcast_id: Mapped[int] = mapped_column(ForeignKey("broadcasts.id"), nullable=False)
+    broadcast_id: Mapped[int] = mapped_column(
+        ForeignKey("broadcasts.id"),
+        primary_key=True,
+        nullable=False,
+    )
 
     user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     message_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
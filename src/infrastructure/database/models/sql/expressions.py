@@ -0,0 +1,8 @@
+from typing import Any
+
+from sqlalchemy import ColumnElement, Integer, cast, literal_column
+
+
+def json_integer(column: Any, key: str) -> ColumnElement[int]:
+    # The key is rendered inline: expression indexes never match a bound `->> $1`
+    return cast(column.op("->>")(literal_column(f"'{key}'")), Integer)
@@ -0,0 +1,77 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Date, DateTime, Enum, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.enums import Currency, PaymentGatewayType, ReferralRewardType
+
+from .base import BaseSql
+
+
+class DailyStatistics(BaseSql):
+    __tablename__ = "daily_statistics"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    new_users: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    new_subscriptions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    new_trials: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+    active_subscriptions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    expired_subscriptions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    trial_subscriptions: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+class DailyRevenue(BaseSql):
+    __tablename__ = "daily_revenue"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    currency: Mapped[Currency] = mapped_column(
+        Enum(
+            Currency,
+            name="currency",
+            create_constraint=True,
+            validate_strings=True,
+        ),
+        primary_key=True,
+    )
+    gateway_type: Mapped[PaymentGatewayType] = mapped_column(
+        Enum(
+            PaymentGatewayType,
+            name="payment_gateway_type",
+            create_constraint=True,
+            validate_strings=True,
+        ),
+        primary_key=True,
+    )
+
+    completed_transactions: Mapped[int] = mapped_column(Integer, nullable=False)
+    paid_transactions: Mapped[int] = mapped_column(Integer, nullable=False)
+    revenue: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
+    discounts: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
+
+
+class DailyReferralRewards(BaseSql):
+    __tablename__ = "daily_referral_rewards"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    type: Mapped[ReferralRewardType] = mapped_column(
+        Enum(
+            ReferralRewardType,
+            name="referral_reward_type",
+            create_constraint=True,
+            validate_strings=True,
+        ),
+        primary_key=True,
+    )
+
+    rewards_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class StatisticsWatermark(BaseSql):
+    __tablename__ = "statistics_watermarks"
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -9,8 +9,9 @@ from datetime import datetime
 from uuid import UUID
 
 from remnapy.enums import TrafficLimitStrategy
-from sqlalchemy import ARRAY, JSON, BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import ARRAY, BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, String
 from sqlalchemy import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.enums import SubscriptionStatus
@@ -63,7 +64,7 @@ class Subscription(BaseSql, TimestampMixin):
     expire_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     url: Mapped[str] = mapped_column(String, nullable=False)
 
-    plan: Mapped[PlanSnapshotDto] = mapped_column(JSON, nullable=False)
+    plan: Mapped[PlanSnapshotDto] = mapped_column(JSONB, nullable=False)
 
     user: Mapped["User"] = relationship(
         "User",
@@ -9,6 +9,7 @@ from uuid import UUID
 
 from sqlalchemy import JSON, BigInteger, Boolean, Enum, ForeignKey, Integer
 from sqlalchemy import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.enums import Currency, PaymentGatewayType, PurchaseType, TransactionStatus
@@ -62,6 +63,6 @@ class Transaction(BaseSql, TimestampMixin):
         ),
         nullable=False,
     )
-    plan: Mapped[PlanSnapshotDto] = mapped_column(JSON, nullable=False)
+    plan: Mapped[PlanSnapshotDto] = mapped_column(JSONB, nullable=False)
 
     user: Mapped["User"] = relationship("User", foreign_keys=[user_telegram_id], lazy="selectin")
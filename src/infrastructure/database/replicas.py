@@ -0,0 +1,18 @@
+from itertools import cycle
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class ReadReplicas:
+    session_pools: list[async_sessionmaker[AsyncSession]]
+
+    def __init__(self, session_pools: list[async_sessionmaker[AsyncSession]]) -> None:
+        self.session_pools = session_pools
+        self._next_pool = cycle(session_pools)
+
+    def get_session_pool(self) -> Optional[async_sessionmaker[AsyncSession]]:
+        if not self.session_pools:
+            return None
+
+        return next(self._next_pool)
@@ -1,8 +1,9 @@
-from typing import Any, Optional, Type, TypeVar, Union, cast
+from typing import Any, Optional, Sequence, Type, TypeVar, Union, cast
 
-from sqlalchemy import ColumnExpressionArgument, delete, func, select, update
+from sqlalchemy import ColumnExpressionArgument, Select, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.base import ExecutableOption
 
 from src.infrastructure.database.models.sql import BaseSql
 
@@ -25,15 +26,17 @@ class BaseRepository:
         await self.session.refresh(instance)
         return instance
 
-    async def create_instances(self, instances: list[T]) -> list[T]:
-        if not instances:
+    async def insert_many(self, model: ModelType[T], rows: list[dict[str, Any]]) -> list[int]:
+        if not rows:
             return []
 
-        self.session.add_all(instances)
-        await self.session.flush()
-        for instance in instances:
-            await self.session.refresh(instance)
-        return instances
+        # Sent as batched multi-row INSERT ... RETURNING, ids come back in the order of `rows`
+        query = insert(model).returning(
+            model.id,  # type: ignore[attr-defined]
+            sort_by_parameter_order=True,
+        )
+        result = await self.session.execute(query, rows)
+        return list(result.scalars().all())
 
     async def merge_instance(self, instance: T) -> T:
         return await self.session.merge(instance)
@@ -41,8 +44,18 @@ class BaseRepository:
     async def delete_instance(self, instance: T) -> None:
         await self.session.delete(instance)
 
-    async def _get_one(self, model: ModelType[T], *conditions: ConditionType) -> Optional[T]:
-        result = await self.session.execute(select(model).where(*conditions))
+    async def _get_one(
+        self,
+        model: ModelType[T],
+        *conditions: ConditionType,
+        options: Sequence[ExecutableOption] = (),
+    ) -> Optional[T]:
+        result = await self.session.execute(select(model).where(*conditions).options(*options))
+        return result.unique().scalar_one_or_none()
+
+    async def _get_one_prepared(self, statement: Select[tuple[T]], **params: Any) -> Optional[T]:
+        # Prebuilt statements memoize their cache key, so only parameters are processed per call
+        result = await self.session.execute(statement, params)
         return result.unique().scalar_one_or_none()
 
     async def _get_many(
@@ -52,8 +65,9 @@ class BaseRepository:
         order_by: Optional[OrderByArgument] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
+        options: Sequence[ExecutableOption] = (),
     ) -> list[T]:
-        query = select(model).where(*conditions)
+        query = select(model).where(*conditions).options(*options)
 
         if order_by is not None:
             if isinstance(order_by, (list, tuple)):
@@ -75,27 +89,27 @@ class BaseRepository:
         model: ModelType[T],
         *conditions: ConditionType,
         load_result: bool = True,
+        options: Sequence[ExecutableOption] = (),
         **kwargs: Any,
     ) -> Optional[T]:
         if not kwargs:
             if not load_result:
                 return None
-            return cast(Optional[T], await self._get_one(model, *conditions))
+            return cast(Optional[T], await self._get_one(model, *conditions, options=options))
 
         query = update(model).where(*conditions).values(**kwargs)
 
-        if load_result:
-            query = query.returning(model.id)  # type: ignore [attr-defined]
-
-        result = await self.session.execute(query)
-        obj_id: Optional[int] = result.scalar_one_or_none()
-
-        if obj_id is not None and load_result:
-            db_obj = await self.session.get(model, obj_id)
-            await self.session.refresh(db_obj)
-            return db_obj
-
-        return None
+        if not load_result:
+            await self.session.execute(query)
+            return None
+
+        # The full row comes back with the UPDATE itself. RETURNING can't carry a JOIN, so eager
+        # loaders in `options` have to be SELECT IN based
+        result = await self.session.execute(
+            query.returning(model).options(*options),
+            execution_options={"populate_existing": True},
+        )
+        return cast(Optional[T], result.unique().scalar_one_or_none())
 
     async def _delete(self, model: ModelType[T], *conditions: ConditionType) -> int:
         result = await self.session.execute(delete(model).where(*conditions))
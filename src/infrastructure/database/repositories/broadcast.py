@@ -1,19 +1,130 @@
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Optional, cast
 from uuid import UUID
 
-from sqlalchemy import update
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    Integer,
+    Select,
+    any_,
+    column,
+    delete,
+    exists,
+    insert,
+    literal,
+    select,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-from src.infrastructure.database.models.sql import Broadcast, BroadcastMessage
+from src.core.enums import BroadcastMessageStatus, BroadcastStatus, Locale
+from src.infrastructure.database.models.sql import Broadcast, BroadcastMessage, User
 
-from .base import BaseRepository
+from .base import BaseRepository, ConditionType
+
+
+def _old_broadcasts(created_before: datetime) -> Select[tuple[int]]:
+    return select(Broadcast.id).where(
+        Broadcast.status != BroadcastStatus.PROCESSING,
+        Broadcast.created_at < created_before,
+    )
+
+
+def _messages_partition(broadcast_id: int) -> str:
+    # Partitions are named after the broadcast, see migration 0020
+    return f"{BroadcastMessage.__tablename__}_{int(broadcast_id)}"
 
 
 class BroadcastRepository(BaseRepository):
     async def create(self, broadcast: Broadcast) -> Broadcast:
         return await self.create_instance(broadcast)
 
-    async def create_messages(self, messages: list[BroadcastMessage]) -> list[BroadcastMessage]:
-        return await self.create_instances(messages)
+    async def create_messages_partition(self, broadcast_id: int) -> None:
+        await self.session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {_messages_partition(broadcast_id)} "
+                f"PARTITION OF {BroadcastMessage.__tablename__} "
+                f"FOR VALUES FROM ({int(broadcast_id)}) TO ({int(broadcast_id) + 1})"
+            )
+        )
+
+    async def detach_messages_partition(self, broadcast_id: int) -> bool:
+        partition = _messages_partition(broadcast_id)
+        engine = cast(AsyncEngine, self.session.bind)
+
+        # CONCURRENTLY refuses to run inside a transaction block, so it gets its own connection
+        async with engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            detach_pending = await connection.scalar(
+                text(
+                    "SELECT inhdetachpending FROM pg_inherits "
+                    "WHERE inhrelid = to_regclass(:partition) "
+                    "AND inhparent = to_regclass(:parent)"
+                ),
+                {"partition": partition, "parent": BroadcastMessage.__tablename__},
+            )
+
+            if detach_pending is None:
+                return False
+
+            # An interrupted concurrent detach leaves the partition pending until finalized
+            mode = "FINALIZE" if detach_pending else "CONCURRENTLY"
+            await connection.execute(
+                text(
+                    f"ALTER TABLE {BroadcastMessage.__tablename__} "
+                    f"DETACH PARTITION {partition} {mode}"
+                )
+            )
+
+        return True
+
+    async def drop_messages_partition(self, broadcast_id: int) -> None:
+        partition = _messages_partition(broadcast_id)
+        await self.session.execute(text(f"DROP TABLE IF EXISTS {partition}"))
+
+    async def create_messages_for_users(self, broadcast_id: int, *conditions: ConditionType) -> int:
+        recipients = (
+            select(
+                literal(broadcast_id),
+                User.telegram_id,
+                literal(BroadcastMessageStatus.PENDING, BroadcastMessage.status.type),
+            )
+            .where(*conditions)
+            .order_by(User.telegram_id.asc())
+        )
+        query = insert(BroadcastMessage).from_select(
+            ["broadcast_id", "user_id", "status"],
+            recipients,
+        )
+
+        result = await self.session.execute(query)
+        return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+    async def get_pending_messages_page(
+        self,
+        broadcast_id: int,
+        after_id: Optional[int],
+        limit: int,
+    ) -> list[tuple[int, int, Locale, str]]:
+        query = (
+            select(BroadcastMessage.id, User.telegram_id, User.language, User.name)
+            .join(User, User.telegram_id == BroadcastMessage.user_id)
+            .where(
+                BroadcastMessage.broadcast_id == broadcast_id,
+                BroadcastMessage.status == BroadcastMessageStatus.PENDING,
+            )
+            .order_by(BroadcastMessage.id.asc())
+            .limit(limit)
+        )
+
+        if after_id is not None:
+            query = query.where(BroadcastMessage.id > after_id)
+
+        result = await self.session.execute(query)
+        return [(row.id, row.telegram_id, row.language, row.name) for row in result]
 
     async def get(self, task_id: UUID) -> Optional[Broadcast]:
         return await self._get_one(Broadcast, Broadcast.task_id == task_id)
@@ -21,6 +132,17 @@ class BroadcastRepository(BaseRepository):
     async def get_all(self) -> list[Broadcast]:
         return await self._get_many(Broadcast, order_by=Broadcast.id.asc())
 
+    async def get_status(self, task_id: UUID) -> Optional[BroadcastStatus]:
+        query = select(Broadcast.status).where(Broadcast.task_id == task_id)
+        return await self.session.scalar(query)
+
+    async def get_messages(self, broadcast_id: int) -> list[BroadcastMessage]:
+        return await self._get_many(
+            BroadcastMessage,
+            BroadcastMessage.broadcast_id == broadcast_id,
+            order_by=BroadcastMessage.id.asc(),
+        )
+
     async def get_message_by_user(
         self, broadcast_id: int, user_id: int
     ) -> Optional[BroadcastMessage]:
@@ -30,21 +152,87 @@ class BroadcastRepository(BaseRepository):
             BroadcastMessage.user_id == user_id,
         )
 
-    async def update(self, task_id: UUID, **data: Any) -> Optional[Broadcast]:
-        return await self._update(Broadcast, Broadcast.task_id == task_id, **data)
+    async def update(
+        self,
+        task_id: UUID,
+        load_result: bool = True,
+        **data: Any,
+    ) -> Optional[Broadcast]:
+        return await self._update(
+            Broadcast,
+            Broadcast.task_id == task_id,
+            load_result=load_result,
+            **data,
+        )
 
     async def update_message(
-        self, broadcast_id: int, user_id: int, **data: Any
+        self,
+        broadcast_id: int,
+        user_id: int,
+        load_result: bool = True,
+        **data: Any,
     ) -> Optional[BroadcastMessage]:
         return await self._update(
             BroadcastMessage,
             BroadcastMessage.broadcast_id == broadcast_id,
             BroadcastMessage.user_id == user_id,
+            load_result=load_result,
             **data,
         )
 
-    async def bulk_update_messages(self, data: list[dict]) -> None:
-        if not data:
-            return
+    async def update_messages_status(
+        self,
+        broadcast_id: int,
+        status: BroadcastMessageStatus,
+        message_ids: list[int],
+    ) -> int:
+        query = (
+            update(BroadcastMessage)
+            .where(
+                BroadcastMessage.broadcast_id == broadcast_id,
+                BroadcastMessage.id == any_(literal(message_ids, ARRAY(Integer))),
+            )
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+    async def update_messages_delivery(
+        self,
+        broadcast_id: int,
+        status: BroadcastMessageStatus,
+        deliveries: list[tuple[int, Optional[int]]],
+    ) -> int:
+        delivered = values(
+            column("id", Integer),
+            column("message_id", BigInteger),
+            name="delivered",
+        ).data(deliveries)
 
-        await self.session.execute(update(BroadcastMessage), data)
+        query = (
+            update(BroadcastMessage)
+            .where(
+                BroadcastMessage.broadcast_id == broadcast_id,
+                BroadcastMessage.id == delivered.c.id,
+            )
+            .values(status=status, message_id=delivered.c.message_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+    async def get_old_ids(self, created_before: datetime) -> list[int]:
+        result = await self.session.scalars(_old_broadcasts(created_before))
+        return list(result.all())
+
+    async def delete_old(self, created_before: datetime, limit: int) -> int:
+        has_messages = exists().where(BroadcastMessage.broadcast_id == Broadcast.id)
+        chunk = _old_broadcasts(created_before).where(~has_messages).limit(limit)
+        query = (
+            delete(Broadcast)
+            .where(Broadcast.id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.rowcount  # type: ignore[attr-defined, no-any-return]
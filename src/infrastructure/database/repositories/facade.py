@@ -6,6 +6,7 @@ from .plan import PlanRepository
 from .promocode import PromocodeRepository
 from .referral import ReferralRepository
 from .settings import SettingsRepository
+from .statistics import StatisticsRepository
 from .subscription import SubscriptionRepository
 from .transaction import TransactionRepository
 from .user import UserRepository
@@ -23,6 +24,7 @@ class RepositoriesFacade:
     settings: SettingsRepository
     broadcasts: BroadcastRepository
     referrals: ReferralRepository
+    statistics: StatisticsRepository
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -36,3 +38,4 @@ class RepositoriesFacade:
         self.settings = SettingsRepository(session)
         self.broadcasts = BroadcastRepository(session)
         self.referrals = ReferralRepository(session)
+        self.statistics = StatisticsRepository(session)
@@ -56,5 +56,15 @@ class ReferralRepository(BaseRepository):
         result = await self.session.scalar(query)
         return result or 0
 
-    async def update_reward(self, reward_id: int, **data: Any) -> Optional[ReferralReward]:
-        return await self._update(ReferralReward, ReferralReward.id == reward_id, **data)
+    async def update_reward(
+        self,
+        reward_id: int,
+        load_result: bool = True,
+        **data: Any,
+    ) -> Optional[ReferralReward]:
+        return await self._update(
+            ReferralReward,
+            ReferralReward.id == reward_id,
+            load_result=load_result,
+            **data,
+        )
@@ -0,0 +1,437 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Optional, Type, Union
+
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    Numeric,
+    Select,
+    SelectBase,
+    and_,
+    cast,
+    delete,
+    exists,
+    extract,
+    func,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+
+from src.core.enums import (
+    Currency,
+    PaymentGatewayType,
+    SubscriptionStatus,
+    TransactionStatus,
+)
+from src.infrastructure.database.models.sql import (
+    DailyReferralRewards,
+    DailyRevenue,
+    DailyStatistics,
+    ReferralReward,
+    StatisticsWatermark,
+    Subscription,
+    Transaction,
+    User,
+    json_integer,
+)
+
+from .base import BaseRepository, T
+
+
+def _final_amount() -> ColumnElement[Decimal]:
+    return cast(Transaction.pricing["final_amount"].as_string(), Numeric)
+
+
+def _original_amount() -> ColumnElement[Decimal]:
+    return cast(Transaction.pricing["original_amount"].as_string(), Numeric)
+
+
+def _is_active_subscription(now: datetime) -> ColumnElement[bool]:
+    return and_(Subscription.status == SubscriptionStatus.ACTIVE, Subscription.expire_at >= now)
+
+
+def _day(column: Any) -> ColumnElement[date]:
+    # Must match the `ix_<table>_created_day` expression indexes
+    return cast(func.timezone("UTC", column), Date)
+
+
+def _last_24_hours(column: Any, now: datetime) -> ColumnElement[bool]:
+    # The day bound lets the `ix_<table>_created_day` index narrow the scan to two days
+    since = now - timedelta(days=1)
+    return and_(_day(column) >= since.date(), column > since)
+
+
+def _changed_days(
+    model: Type[T],
+    since: Optional[datetime],
+    recent_from: Optional[date] = None,
+) -> Optional[SelectBase]:
+    if since is None:
+        return None
+
+    day = _day(model.created_at)  # type: ignore[attr-defined]
+    changed = select(day).where(model.updated_at > since)  # type: ignore[attr-defined]
+
+    if recent_from is None:
+        return changed.distinct()
+
+    # Deleted rows leave no `updated_at` behind, so recent days are recomputed as a whole
+    offset = func.generate_series(0, _day(func.now()) - recent_from)
+    return changed.union(select(literal(recent_from, Date) + offset))
+
+
+class StatisticsRepository(BaseRepository):
+    async def get_users_summary(self, now: datetime) -> dict[str, int]:
+        current = aliased(Subscription)
+        trial = aliased(Subscription)
+        paid = aliased(Subscription)
+
+        had_trial = exists().where(
+            trial.user_telegram_id == User.telegram_id,
+            trial.is_trial.is_(True),
+        )
+        had_paid = exists().where(
+            paid.user_telegram_id == User.telegram_id,
+            paid.is_trial.is_(False),
+        )
+
+        query = (
+            select(
+                func.count().label("total_users"),
+                func.count(current.id).label("with_subscription"),
+                func.count().filter(current.is_trial.is_(True)).label("with_trial"),
+                func.count().filter(User.is_blocked.is_(True)).label("blocked"),
+                func.count().filter(User.is_bot_blocked.is_(True)).label("bot_blocked"),
+                func.count().filter(had_trial).label("trial_users"),
+                func.count().filter(had_trial, had_paid).label("converted_from_trial"),
+            )
+            .select_from(User)
+            .outerjoin(current, current.id == User.current_subscription_id)
+        )
+
+        row = (await self.session.execute(query)).one()
+        return dict(row._mapping)
+
+    async def count_paying_users(self) -> int:
+        query = select(func.count(func.distinct(Transaction.user_telegram_id))).where(
+            Transaction.status == TransactionStatus.COMPLETED,
+            _final_amount() != 0,
+        )
+        return await self.session.scalar(query) or 0
+
+    async def get_transactions_summary(self) -> dict[str, int]:
+        is_completed = Transaction.status == TransactionStatus.COMPLETED
+
+        query = select(
+            func.count().label("total"),
+            func.count().filter(is_completed).label("completed"),
+            func.count().filter(_final_amount() == 0).label("free"),
+        ).select_from(Transaction)
+
+        row = (await self.session.execute(query)).one()
+        return dict(row._mapping)
+
+    async def get_subscriptions_summary(self, now: datetime) -> dict[str, int]:
+        is_active = _is_active_subscription(now)
+        is_unlimited = or_(
+            Subscription.traffic_limit <= 0,
+            Subscription.device_limit <= 0,
+            extract("year", Subscription.expire_at) == 2099,
+        )
+
+        query = select(
+            func.count().filter(is_active).label("active"),
+            func.count()
+            .filter(
+                ~is_active,
+                or_(
+                    Subscription.expire_at < now,
+                    Subscription.status == SubscriptionStatus.EXPIRED,
+                ),
+            )
+            .label("expired"),
+            func.count().filter(is_active, Subscription.is_trial.is_(True)).label("active_trial"),
+            func.count()
+            .filter(is_active, Subscription.expire_at < now + timedelta(days=8))
+            .label("expiring"),
+            func.count().filter(is_active, is_unlimited).label("unlimited"),
+            func.count().filter(is_active, Subscription.traffic_limit != -1).label("traffic"),
+            func.count().filter(is_active, Subscription.device_limit != -1).label("devices"),
+        ).select_from(Subscription)
+
+        row = (await self.session.execute(query)).one()
+        return dict(row._mapping)
+
+    async def get_plans_subscriptions(self, now: datetime) -> list[tuple[int, int, int, int]]:
+        plan_id = json_integer(Subscription.plan, "id")
+        duration = json_integer(Subscription.plan, "duration")
+
+        query = (
+            select(
+                plan_id.label("plan_id"),
+                duration.label("duration"),
+                func.count().label("total"),
+                func.count().filter(_is_active_subscription(now)).label("active"),
+            )
+            .group_by(plan_id, duration)
+            .order_by(plan_id, duration)
+        )
+
+        result = await self.session.execute(query)
+        return [(row.plan_id, row.duration, row.total, row.active) for row in result]
+
+    async def get_plans_income(self) -> list[tuple[int, Currency, Decimal]]:
+        plan_id = json_integer(Transaction.plan, "id")
+
+        query = (
+            select(
+                plan_id.label("plan_id"),
+                Transaction.currency,
+                func.sum(_final_amount()).label("income"),
+            )
+            .where(
+                Transaction.status == TransactionStatus.COMPLETED,
+                plan_id != 0,
+            )
+            .group_by(plan_id, Transaction.currency)
+            .order_by(plan_id, Transaction.currency)
+        )
+
+        result = await self.session.execute(query)
+        return [(row.plan_id, row.currency, row.income) for row in result]
+
+    #
+
+    async def get_new_users(self, now: datetime) -> dict[str, int]:
+        today = now.date()
+        # Rollups are per calendar day, "daily" keeps meaning the last 24 hours
+        daily = (
+            select(func.count())
+            .select_from(User)
+            .where(_last_24_hours(User.created_at, now))
+            .scalar_subquery()
+        )
+
+        query = select(
+            daily.label("daily"),
+            func.coalesce(
+                func.sum(DailyStatistics.new_users).filter(
+                    DailyStatistics.day >= today - timedelta(days=7)
+                ),
+                0,
+            ).label("weekly"),
+            func.coalesce(func.sum(DailyStatistics.new_users), 0).label("monthly"),
+        ).where(DailyStatistics.day >= today - timedelta(days=30))
+
+        row = (await self.session.execute(query)).one()
+        return dict(row._mapping)
+
+    async def get_gateways_income(self, now: datetime) -> dict[PaymentGatewayType, dict[str, Any]]:
+        today = now.date()
+        revenue = DailyRevenue.revenue
+        daily = (
+            select(func.coalesce(func.sum(_final_amount()), 0))
+            .where(
+                Transaction.gateway_type == DailyRevenue.gateway_type,
+                Transaction.status == TransactionStatus.COMPLETED,
+                _last_24_hours(Transaction.created_at, now),
+            )
+            .scalar_subquery()
+        )
+
+        query = (
+            select(
+                DailyRevenue.gateway_type,
+                func.sum(revenue).label("total"),
+                daily.label("daily"),
+                func.coalesce(
+                    func.sum(revenue).filter(DailyRevenue.day >= today - timedelta(days=7)), 0
+                ).label("weekly"),
+                func.coalesce(
+                    func.sum(revenue).filter(DailyRevenue.day >= today - timedelta(days=30)), 0
+                ).label("monthly"),
+                func.sum(DailyRevenue.discounts).label("discount"),
+                func.sum(DailyRevenue.completed_transactions).label("completed"),
+                func.sum(DailyRevenue.paid_transactions).label("paid_count"),
+            )
+            .group_by(DailyRevenue.gateway_type)
+            .order_by(DailyRevenue.gateway_type)
+        )
+
+        result = await self.session.execute(query)
+        return {row.gateway_type: dict(row._mapping) for row in result}
+
+    #
+
+    async def get_watermark(self, source: str) -> Optional[datetime]:
+        query = select(StatisticsWatermark.value).where(StatisticsWatermark.source == source)
+        return await self.session.scalar(query)
+
+    async def set_watermark(self, source: str, value: datetime) -> None:
+        query = insert(StatisticsWatermark).values(source=source, value=value)
+        query = query.on_conflict_do_update(
+            index_elements=[StatisticsWatermark.source],
+            set_={"value": query.excluded.value},
+        )
+        await self.session.execute(query)
+
+    async def get_last_change(self, model: Type[T]) -> Optional[datetime]:
+        query = select(func.max(model.updated_at))  # type: ignore[attr-defined]
+        return await self.session.scalar(query)
+
+    async def rollup_users(
+        self,
+        since: Optional[datetime],
+        recent_from: Optional[date] = None,
+    ) -> None:
+        day = _day(User.created_at)
+        query = select(day, func.count()).group_by(day)
+
+        changed_days = _changed_days(User, since, recent_from)
+        await self._reset_daily_statistics(["new_users"], changed_days)
+
+        if changed_days is not None:
+            query = query.where(day.in_(changed_days))
+
+        await self._upsert_daily_statistics(["day", "new_users"], query)
+
+    async def rollup_subscriptions(
+        self,
+        since: Optional[datetime],
+        recent_from: Optional[date] = None,
+    ) -> None:
+        day = _day(Subscription.created_at)
+        query = select(
+            day,
+            func.count(),
+            func.count().filter(Subscription.is_trial.is_(True)),
+        ).group_by(day)
+
+        changed_days = _changed_days(Subscription, since, recent_from)
+        await self._reset_daily_statistics(["new_subscriptions", "new_trials"], changed_days)
+
+        if changed_days is not None:
+            query = query.where(day.in_(changed_days))
+
+        await self._upsert_daily_statistics(["day", "new_subscriptions", "new_trials"], query)
+
+    async def snapshot_subscriptions(self, today: date, now: datetime) -> None:
+        summary = await self.get_subscriptions_summary(now)
+        query = select(
+            literal(today, Date),
+            literal(summary["active"]),
+            literal(summary["expired"]),
+            literal(summary["active_trial"]),
+        )
+
+        await self._upsert_daily_statistics(
+            ["day", "active_subscriptions", "expired_subscriptions", "trial_subscriptions"],
+            query,
+        )
+
+    async def rollup_transactions(
+        self,
+        since: Optional[datetime],
+        recent_from: Optional[date] = None,
+    ) -> None:
+        day = _day(Transaction.created_at)
+        amount = _final_amount()
+
+        changed_days = _changed_days(Transaction, since, recent_from)
+        await self._delete_days(DailyRevenue, changed_days)
+
+        query = (
+            select(
+                day,
+                Transaction.currency,
+                Transaction.gateway_type,
+                func.count(),
+                func.count().filter(amount != 0),
+                func.sum(amount),
+                func.sum(_original_amount() - amount),
+            )
+            .where(Transaction.status == TransactionStatus.COMPLETED)
+            .group_by(day, Transaction.currency, Transaction.gateway_type)
+        )
+
+        if changed_days is not None:
+            query = query.where(day.in_(changed_days))
+
+        await self.session.execute(
+            insert(DailyRevenue).from_select(
+                [
+                    "day",
+                    "currency",
+                    "gateway_type",
+                    "completed_transactions",
+                    "paid_transactions",
+                    "revenue",
+                    "discounts",
+                ],
+                query,
+            )
+        )
+
+    async def rollup_referral_rewards(
+        self,
+        since: Optional[datetime],
+        recent_from: Optional[date] = None,
+    ) -> None:
+        day = _day(ReferralReward.created_at)
+
+        changed_days = _changed_days(ReferralReward, since, recent_from)
+        await self._delete_days(DailyReferralRewards, changed_days)
+
+        query = (
+            select(day, ReferralReward.type, func.count(), func.sum(ReferralReward.amount))
+            .where(ReferralReward.is_issued.is_(True))
+            .group_by(day, ReferralReward.type)
+        )
+
+        if changed_days is not None:
+            query = query.where(day.in_(changed_days))
+
+        await self.session.execute(
+            insert(DailyReferralRewards).from_select(
+                ["day", "type", "rewards_count", "amount"],
+                query,
+            )
+        )
+
+    async def _upsert_daily_statistics(self, columns: list[str], query: Select[Any]) -> None:
+        statement = insert(DailyStatistics).from_select(columns, query)
+        statement = statement.on_conflict_do_update(
+            index_elements=[DailyStatistics.day],
+            set_={column: statement.excluded[column] for column in columns if column != "day"},
+        )
+        await self.session.execute(statement)
+
+    async def _reset_daily_statistics(
+        self,
+        columns: list[str],
+        changed_days: Optional[SelectBase],
+    ) -> None:
+        # Days left without rows get no upsert, their counters are zeroed beforehand
+        query = update(DailyStatistics).values(dict.fromkeys(columns, 0))
+
+        if changed_days is not None:
+            query = query.where(DailyStatistics.day.in_(changed_days))
+
+        await self.session.execute(query)
+
+    async def _delete_days(
+        self,
+        model: Union[Type[DailyRevenue], Type[DailyReferralRewards]],
+        changed_days: Optional[SelectBase],
+    ) -> None:
+        query = delete(model)
+
+        if changed_days is not None:
+            query = query.where(model.day.in_(changed_days))
+
+        await self.session.execute(query)
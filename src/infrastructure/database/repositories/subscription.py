@@ -1,16 +1,29 @@
-from typing import Any, Optional
+from typing import Any, Final, Optional
 
-from src.infrastructure.database.models.sql import Subscription
+from sqlalchemy import Select, bindparam, select
+
+from src.infrastructure.database.models.sql import Subscription, User, json_integer
 
 from .base import BaseRepository
 
+SUBSCRIPTION_BY_ID: Final[Select[tuple[Subscription]]] = select(Subscription).where(
+    Subscription.id == bindparam("subscription_id")
+)
+
 
 class SubscriptionRepository(BaseRepository):
     async def create(self, subscription: Subscription) -> Subscription:
         return await self.create_instance(subscription)
 
+    async def create_many(self, subscriptions: list[dict[str, Any]]) -> list[int]:
+        return await self.insert_many(Subscription, subscriptions)
+
     async def get(self, subscription_id: int) -> Optional[Subscription]:
-        return await self._get_one(Subscription, Subscription.id == subscription_id)
+        return await self._get_one_prepared(SUBSCRIPTION_BY_ID, subscription_id=subscription_id)
+
+    async def get_current_by_users(self, telegram_ids: list[int]) -> list[Subscription]:
+        current_ids = select(User.current_subscription_id).where(User.telegram_id.in_(telegram_ids))
+        return await self._get_many(Subscription, Subscription.id.in_(current_ids))
 
     async def get_all_by_user(self, telegram_id: int) -> list[Subscription]:
         return await self._get_many(Subscription, Subscription.user_telegram_id == telegram_id)
@@ -22,4 +35,4 @@ class SubscriptionRepository(BaseRepository):
         return await self._update(Subscription, Subscription.id == subscription_id, **data)
 
     async def filter_by_plan_id(self, plan_id: int) -> list[Subscription]:
-        return await self._get_many(Subscription, Subscription.plan["id"].as_integer() == plan_id)
+        return await self._get_many(Subscription, json_integer(Subscription.plan, "id") == plan_id)
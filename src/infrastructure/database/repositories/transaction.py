@@ -1,18 +1,25 @@
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Final, Optional
 from uuid import UUID
 
+from sqlalchemy import Select, bindparam, select, update
+
 from src.core.enums import TransactionStatus
 from src.infrastructure.database.models.sql import Transaction
 
 from .base import BaseRepository
 
+TRANSACTION_BY_PAYMENT_ID: Final[Select[tuple[Transaction]]] = select(Transaction).where(
+    Transaction.payment_id == bindparam("payment_id")
+)
+
 
 class TransactionRepository(BaseRepository):
     async def create(self, transaction: Transaction) -> Transaction:
         return await self.create_instance(transaction)
 
     async def get(self, payment_id: UUID) -> Optional[Transaction]:
-        return await self._get_one(Transaction, Transaction.payment_id == payment_id)
+        return await self._get_one_prepared(TRANSACTION_BY_PAYMENT_ID, payment_id=payment_id)
 
     async def get_by_user(self, telegram_id: int) -> list[Transaction]:
         return await self._get_many(Transaction, Transaction.user_telegram_id == telegram_id)
@@ -31,3 +38,24 @@ class TransactionRepository(BaseRepository):
 
     async def count_by_status(self, status: TransactionStatus) -> int:
         return await self._count(Transaction, Transaction.status == status)
+
+    async def cancel_pending(self, created_before: datetime, limit: int) -> int:
+        # Locked rows belong to a payment being processed right now, the next run picks them up
+        stale = (
+            select(Transaction.id)
+            .where(
+                Transaction.status == TransactionStatus.PENDING,
+                Transaction.created_at < created_before,
+            )
+            .order_by(Transaction.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(Transaction)
+            .where(Transaction.id.in_(stale))
+            .values(status=TransactionStatus.CANCELED)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.rowcount  # type: ignore[attr-defined, no-any-return]
@@ -1,39 +1,172 @@
-from typing import Any, Optional
+from typing import Any, Final, Literal, Optional
 
-from sqlalchemy import func, or_
+from sqlalchemy import Select, and_, bindparam, exists, func, literal, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload, with_expression
+from sqlalchemy.sql.base import ExecutableOption
 
 from src.core.enums import UserRole
-from src.infrastructure.database.models.sql import User
+from src.infrastructure.database.models.sql import Referral, Subscription, User
 
 from .base import BaseRepository
 
+UserLoadProfile = Literal["bare", "with_current_subscription", "full"]
+UserSearchCursor = tuple[float, int]
+
+# Plan availability needs these flags, EXISTS keeps them in the same statement as the user
+USER_FLAGS: Final[tuple[ExecutableOption, ...]] = (
+    with_expression(
+        User.any_subscription,
+        exists().where(Subscription.user_telegram_id == User.telegram_id),
+    ),
+    with_expression(
+        User.invited,
+        exists().where(Referral.referred_telegram_id == User.telegram_id),
+    ),
+)
+
+# Relationships of User are never loaded implicitly, every query states what it needs
+USER_LOAD_PROFILES: Final[dict[UserLoadProfile, tuple[ExecutableOption, ...]]] = {
+    "bare": (),
+    "with_current_subscription": (
+        joinedload(User.current_subscription).lazyload("*"),
+        *USER_FLAGS,
+    ),
+    "full": (
+        *USER_FLAGS,
+        joinedload(User.current_subscription).lazyload("*"),
+        selectinload(User.subscriptions).lazyload("*"),
+        selectinload(User.referral).lazyload("*"),
+    ),
+}
+
+USER_RETURNING_PROFILES: Final[dict[UserLoadProfile, tuple[ExecutableOption, ...]]] = {
+    "bare": (),
+    "with_current_subscription": (selectinload(User.current_subscription).lazyload("*"),),
+    "full": (
+        selectinload(User.current_subscription).lazyload("*"),
+        selectinload(User.subscriptions).lazyload("*"),
+        selectinload(User.referral).lazyload("*"),
+    ),
+}
+
+USER_BY_TELEGRAM_ID: Final[dict[UserLoadProfile, Select[tuple[User]]]] = {
+    profile: select(User).where(User.telegram_id == bindparam("telegram_id")).options(*options)
+    for profile, options in USER_LOAD_PROFILES.items()
+}
+
 
 class UserRepository(BaseRepository):
     async def create(self, user: User) -> User:
         return await self.create_instance(user)
 
-    async def get(self, telegram_id: int) -> Optional[User]:
-        return await self._get_one(User, User.telegram_id == telegram_id)
+    async def create_many(self, users: list[dict[str, Any]]) -> list[int]:
+        return await self.insert_many(User, users)
+
+    async def get(
+        self,
+        telegram_id: int,
+        profile: UserLoadProfile = "with_current_subscription",
+    ) -> Optional[User]:
+        return await self._get_one_prepared(USER_BY_TELEGRAM_ID[profile], telegram_id=telegram_id)
+
+    async def get_by_ids(
+        self,
+        telegram_ids: list[int],
+        profile: UserLoadProfile = "with_current_subscription",
+    ) -> list[User]:
+        return await self._get_many(
+            User,
+            User.telegram_id.in_(telegram_ids),
+            options=USER_LOAD_PROFILES[profile],
+        )
 
-    async def get_by_ids(self, telegram_ids: list[int]) -> list[User]:
-        return await self._get_many(User, User.telegram_id.in_(telegram_ids))
+    async def search_by_name(
+        self,
+        query: str,
+        limit: int,
+        after: Optional[UserSearchCursor] = None,
+        profile: UserLoadProfile = "bare",
+    ) -> list[tuple[User, float]]:
+        search_query = query.lower()
+        search_pattern = f"%{search_query}%"
+        name = func.lower(User.name)
+        username = func.lower(User.username)
 
-    async def get_by_partial_name(self, query: str) -> list[User]:
-        search_pattern = f"%{query.lower()}%"
+        # Every condition is served by the `ix_users_*_trgm` GIN indexes
         conditions = [
-            func.lower(User.name).like(search_pattern),
-            func.lower(User.username).like(search_pattern),
+            name.like(search_pattern),
+            username.like(search_pattern),
+            literal(search_query).op("<%")(name),
+            literal(search_query).op("<%")(username),
         ]
-        return await self._get_many(User, or_(*conditions))
+        rank = func.greatest(
+            func.word_similarity(search_query, name),
+            func.word_similarity(search_query, username),
+        ).label("rank")
 
-    async def get_by_referral_code(self, referral_code: str) -> Optional[User]:
-        return await self._get_one(User, User.referral_code == referral_code)
+        statement = (
+            select(User, rank)
+            .where(or_(*conditions))
+            .options(*USER_LOAD_PROFILES[profile])
+            .order_by(rank.desc(), User.telegram_id)
+            .limit(limit)
+        )
 
-    async def get_all(self) -> list[User]:
-        return await self._get_many(User)
+        if after is not None:
+            after_rank, after_telegram_id = after
+            statement = statement.where(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, User.telegram_id > after_telegram_id),
+                )
+            )
 
-    async def update(self, telegram_id: int, **data: Any) -> Optional[User]:
-        return await self._update(User, User.telegram_id == telegram_id, **data)
+        result = await self.session.execute(statement)
+        return [(user, float(user_rank)) for user, user_rank in result.unique().all()]
+
+    async def get_by_referral_code(
+        self,
+        referral_code: str,
+        profile: UserLoadProfile = "with_current_subscription",
+    ) -> Optional[User]:
+        return await self._get_one(
+            User,
+            User.referral_code == referral_code,
+            options=USER_LOAD_PROFILES[profile],
+        )
+
+    async def get_all(self, profile: UserLoadProfile = "with_current_subscription") -> list[User]:
+        return await self._get_many(User, options=USER_LOAD_PROFILES[profile])
+
+    async def update(
+        self,
+        telegram_id: int,
+        profile: UserLoadProfile = "with_current_subscription",
+        load_result: bool = True,
+        **data: Any,
+    ) -> Optional[User]:
+        return await self._update(
+            User,
+            User.telegram_id == telegram_id,
+            load_result=load_result,
+            options=USER_RETURNING_PROFILES[profile],
+            **data,
+        )
+
+    async def set_current_subscriptions(self, subscription_ids: list[int]) -> None:
+        if not subscription_ids:
+            return
+
+        query = (
+            update(User)
+            .where(
+                User.telegram_id == Subscription.user_telegram_id,
+                Subscription.id.in_(subscription_ids),
+            )
+            .values(current_subscription_id=Subscription.id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(query)
 
     async def delete(self, telegram_id: int) -> bool:
         return bool(await self._delete(User, User.telegram_id == telegram_id))
@@ -41,8 +174,17 @@ class UserRepository(BaseRepository):
     async def count(self) -> int:
         return await self._count(User)
 
-    async def filter_by_role(self, role: UserRole) -> list[User]:
-        return await self._get_many(User, User.role == role)
+    async def get_all_ids(self) -> list[int]:
+        query = select(User.telegram_id).order_by(User.id.asc())
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def get_ids_by_role(self, role: UserRole) -> list[int]:
+        query = select(User.telegram_id).where(User.role == role).order_by(User.id.asc())
+        result = await self.session.scalars(query)
+        return list(result.all())
 
-    async def filter_by_blocked(self, blocked: bool) -> list[User]:
-        return await self._get_many(User, User.is_blocked == blocked)
+    async def get_blocked_ids(self) -> list[int]:
+        query = select(User.telegram_id).where(User.is_blocked.is_(True)).order_by(User.id.desc())
+        result = await self.session.scalars(query)
+        return list(result.all())
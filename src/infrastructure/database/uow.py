@@ -1,25 +1,57 @@
 from types import TracebackType
-from typing import Optional, Self, Type
+from typing import Any, Final, Optional, Self, Type
 
 from loguru import logger
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
 
+from .metrics import database_metrics
+from .replicas import ReadReplicas
 from .repositories import RepositoriesFacade
 
+HAS_WRITES_KEY: Final[str] = "has_writes"
+PENDING_WRITES_KEY: Final[str] = "pending_writes"
+
+
+def _mark_writes(session: Session) -> None:
+    session.info[HAS_WRITES_KEY] = True
+    session.info[PENDING_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session: Session, flush_context: Any) -> None:
+    _mark_writes(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement(orm_execute_state: ORMExecuteState) -> None:
+    # Anything but a SELECT counts as a write, including DML and DDL issued as text
+    if not orm_execute_state.is_select:
+        _mark_writes(orm_execute_state.session)
+
 
 class UnitOfWork:
     session_pool: async_sessionmaker[AsyncSession]
     session: Optional[AsyncSession] = None
 
-    repository: RepositoriesFacade
+    replicas: Optional[ReadReplicas]
+    replica_session: Optional[AsyncSession] = None
+
+    _repository: Optional[RepositoriesFacade] = None
+    _replica_repository: Optional[RepositoriesFacade] = None
 
-    def __init__(self, session_pool: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(
+        self,
+        session_pool: async_sessionmaker[AsyncSession],
+        replicas: Optional[ReadReplicas] = None,
+    ) -> None:
         self.session_pool = session_pool
+        self.replicas = replicas
 
     async def __aenter__(self) -> Self:
-        self.session = self.session_pool()
-        self.repository = RepositoriesFacade(session=self.session)
-        logger.debug(f"Opened session '{id(self.session)}'")
+        # The session is opened on first repository access, many requests never need one
+        database_metrics.units_of_work += 1
         return self
 
     async def __aexit__(
@@ -28,6 +60,8 @@ class UnitOfWork:
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> None:
+        await self._close_replica()
+
         if self.session is None:
             return
 
@@ -44,13 +78,78 @@ class UnitOfWork:
             await self.session.close()
             logger.debug(f"Closed session '{session_id}'")
             self.session = None
+            self._repository = None
+
+    @property
+    def repository(self) -> RepositoriesFacade:
+        if self._repository is None:
+            self.session = self.session_pool()
+            self._repository = RepositoriesFacade(session=self.session)
+            database_metrics.sessions_opened += 1
+            logger.debug(f"Opened session '{id(self.session)}'")
+
+        return self._repository
+
+    @property
+    def has_writes(self) -> bool:
+        return self.session is not None and self.session.info.get(HAS_WRITES_KEY, False)
+
+    @property
+    def replica(self) -> RepositoriesFacade:
+        # Once this unit of work has written anything, reads stay on the primary to see it
+        if self.has_writes or self.replicas is None:
+            return self.repository
+
+        if self._replica_repository is None:
+            session_pool = self.replicas.get_session_pool()
+
+            if session_pool is None:
+                return self.repository
+
+            self.replica_session = session_pool()
+            self._replica_repository = RepositoriesFacade(session=self.replica_session)
+            database_metrics.replica_sessions_opened += 1
+            logger.debug(f"Opened replica session '{id(self.replica_session)}'")
+
+        return self._replica_repository
 
     async def commit(self) -> None:
-        if self.session:
-            await self.session.commit()
-            logger.debug(f"Session '{id(self.session)}' committed")
+        if self.session is None:
+            return
+
+        if not self._has_pending_writes():
+            database_metrics.commits_skipped += 1
+            logger.debug(f"Session '{id(self.session)}' has no changes, commit skipped")
+            return
+
+        await self.session.commit()
+        self.session.info.pop(PENDING_WRITES_KEY, None)
+        database_metrics.commits += 1
+        logger.debug(f"Session '{id(self.session)}' committed")
 
     async def rollback(self) -> None:
         if self.session:
             await self.session.rollback()
+            self.session.info.pop(PENDING_WRITES_KEY, None)
             logger.debug(f"Session '{id(self.session)}' rolled back")
+
+    def _has_pending_writes(self) -> bool:
+        if self.session is None:
+            return False
+
+        return bool(
+            self.session.info.get(PENDING_WRITES_KEY)
+            or self.session.new
+            or self.session.dirty
+            or self.session.deleted
+        )
+
+    async def _close_replica(self) -> None:
+        if self.replica_session is None:
+            return
+
+        session_id = id(self.replica_session)
+        await self.replica_session.close()
+        logger.debug(f"Closed replica session '{session_id}'")
+        self.replica_session = None
+        self._replica_repository = None
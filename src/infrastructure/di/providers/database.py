@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from src.core.config import AppConfig
-from src.infrastructure.database import UnitOfWork
+from src.infrastructure.database import IdentityMap, ReadReplicas, UnitOfWork
 
 
 class DatabaseProvider(Provider):
@@ -19,19 +19,23 @@ class DatabaseProvider(Provider):
     @provide
     async def get_engine(self, config: AppConfig) -> AsyncIterable[AsyncEngine]:
         logger.debug("Creating AsyncEngine")
-        engine = create_async_engine(
-            url=config.database.dsn,
-            echo=config.database.echo,
-            echo_pool=config.database.echo_pool,
-            pool_size=config.database.pool_size,
-            max_overflow=config.database.max_overflow,
-            pool_timeout=config.database.pool_timeout,
-            pool_recycle=config.database.pool_recycle,
-        )
+        engine = self._create_engine(config, config.database.dsn)
         yield engine
         logger.debug("Disposing AsyncEngine")
         await engine.dispose()
 
+    @provide
+    async def get_read_replicas(self, config: AppConfig) -> AsyncIterable[ReadReplicas]:
+        engines = [self._create_engine(config, dsn) for dsn in config.database.replica_dsns]
+        logger.debug(f"Created '{len(engines)}' replica engines")
+        yield ReadReplicas(
+            [async_sessionmaker(bind=engine, expire_on_commit=False) for engine in engines]
+        )
+
+        for engine in engines:
+            await engine.dispose()
+        logger.debug("Disposed replica engines")
+
     @provide
     def get_session_maker(self, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
         session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -42,6 +46,25 @@ class DatabaseProvider(Provider):
     async def get_uow(
         self,
         session_maker: async_sessionmaker[AsyncSession],
+        replicas: ReadReplicas,
     ) -> AsyncIterable[UnitOfWork]:
-        async with UnitOfWork(session_maker) as uow:
+        async with UnitOfWork(session_maker, replicas) as uow:
             yield uow
+
+    identity_map = provide(source=IdentityMap, scope=Scope.REQUEST)
+
+    def _create_engine(self, config: AppConfig, url: str) -> AsyncEngine:
+        return create_async_engine(
+            url=url,
+            echo=config.database.echo,
+            echo_pool=config.database.echo_pool,
+            pool_size=config.database.pool_size,
+            max_overflow=config.database.max_overflow,
+            pool_timeout=config.database.pool_timeout,
+            pool_recycle=config.database.pool_recycle,
+            query_cache_size=config.database.query_cache_size,
+            # Per-connection cache of asyncpg prepared statements, 0 disables it (e.g. PgBouncer)
+            connect_args={
+                "prepared_statement_cache_size": config.database.prepared_statement_cache_size,
+            },
+        )
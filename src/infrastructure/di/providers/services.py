@@ -12,6 +12,7 @@ from src.services.promocode import PromocodeService
 from src.services.referral import ReferralService
 from src.services.remnawave import RemnawaveService
 from src.services.settings import SettingsService
+from src.services.statistics import StatisticsService
 from src.services.subscription import SubscriptionService
 from src.services.transaction import TransactionService
 from src.services.user import UserService
@@ -37,3 +38,4 @@ class ServicesProvider(Provider):
     pricing_service = provide(source=PricingService)
     importer_service = provide(source=ImporterService)
     referral_service = provide(source=ReferralService, scope=Scope.REQUEST)
+    statistics_service = provide(source=StatisticsService, scope=Scope.REQUEST)
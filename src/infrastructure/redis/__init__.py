@@ -1,7 +1,10 @@
-from .cache import redis_cache
+from .cache import get_cached_many, invalidate_cache, redis_cache, set_cached_many
 from .repository import RedisRepository
 
 __all__ = [
+    "get_cached_many",
+    "invalidate_cache",
     "redis_cache",
+    "set_cached_many",
     "RedisRepository",
 ]
@@ -1,35 +1,228 @@
+import asyncio
+import copy
+import math
+import random
+import time
+import uuid
 from functools import wraps
-from typing import Any, Awaitable, Callable, Optional, ParamSpec, TypeVar, get_type_hints
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Final,
+    Iterable,
+    Optional,
+    ParamSpec,
+    Sequence,
+    TypeVar,
+    get_type_hints,
+)
 
 from loguru import logger
-from pydantic import SecretStr, TypeAdapter
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 from redis.typing import ExpiryT
 
-from src.core.constants import TIME_1M
-from src.core.utils import json_utils
+from src.core.constants import CACHE_LOCAL_MAXSIZE, TIME_1M
+from src.core.storage.key_builder import build_key
+
+from .local_cache import INVALIDATION_CHANNEL, MISSING, local_cache
+from .metrics import cache_metrics
+from .serializers import CacheSerializer, JsonCacheSerializer
 
 T = TypeVar("T", bound=Any)
 P = ParamSpec("P")
 
+CACHE_LOCK_TIMEOUT_MS: Final[int] = 10_000
+CACHE_LOCK_POLL_INTERVAL: Final[float] = 0.05
+
+RELEASE_LOCK_SCRIPT: Final[str] = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# KEYS are tag sets, ARGV[1] is the invalidation channel, the rest of ARGV are plain keys
+INVALIDATE_SCRIPT: Final[str] = """
+local deleted = {}
+for i = 2, #ARGV do
+    table.insert(deleted, ARGV[i])
+end
+for _, tag_key in ipairs(KEYS) do
+    for _, member in ipairs(redis.call("SMEMBERS", tag_key)) do
+        table.insert(deleted, member)
+    end
+    table.insert(deleted, tag_key)
+end
+for i = 1, #deleted, 500 do
+    redis.call("DEL", unpack(deleted, i, math.min(i + 499, #deleted)))
+end
+if #deleted > 0 then
+    redis.call("PUBLISH", ARGV[1], cjson.encode({keys = deleted}))
+end
+return deleted
+"""
+
+_inflight: dict[str, asyncio.Future[Any]] = {}
+_compute_times: dict[str, float] = {}
+
+
+class CacheSpec:
+    serializer: CacheSerializer
+    ttl: ExpiryT
+    tags: Sequence[str]
 
-def prepare_for_cache(obj: Any) -> Any:
-    if isinstance(obj, SecretStr):
-        return obj.get_secret_value()
-    elif isinstance(obj, dict):
-        return {k: prepare_for_cache(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [prepare_for_cache(v) for v in obj]
-    return obj
+    def __init__(self, serializer: CacheSerializer, ttl: ExpiryT, tags: Sequence[str]) -> None:
+        self.serializer = serializer
+        self.ttl = ttl
+        self.tags = tags
 
 
-def redis_cache(
+_specs: dict[str, CacheSpec] = {}
+
+
+def redis_cache(  # noqa: C901
     prefix: Optional[str] = None,
     ttl: ExpiryT = TIME_1M,
+    local_ttl: Optional[float] = None,
+    local_maxsize: int = CACHE_LOCAL_MAXSIZE,
+    single_flight: bool = True,
+    early_refresh: Optional[float] = None,
+    tags: Sequence[str] = (),
+    serializer: type[CacheSerializer] = JsonCacheSerializer,
 ) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
-    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:  # noqa: C901
         return_type: Any = get_type_hints(func)["return"]
-        type_adapter: TypeAdapter[T] = TypeAdapter(return_type)
+        cache_serializer: CacheSerializer = serializer(return_type)
+        cache_prefix: str = prefix or func.__name__
+        l1_ttl: float = local_ttl or 0
+        _specs[cache_prefix] = CacheSpec(cache_serializer, ttl, tags)
+        stats = cache_metrics.get(cache_prefix)
+
+        if local_ttl is not None:
+            local_cache.configure(cache_prefix, maxsize=local_maxsize)
+
+        def decode(cached_value: bytes) -> T:
+            try:
+                return cache_serializer.loads(cached_value)  # type: ignore[no-any-return]
+            except Exception:
+                stats.decode_failures += 1
+                raise
+
+        async def read(redis: Redis, key: str) -> Any:
+            try:
+                started = time.monotonic()
+                if early_refresh is None:
+                    cached_value: Optional[bytes] = await redis.get(key)
+                    ttl_left_ms = -1
+                else:
+                    async with redis.pipeline(transaction=False) as pipeline:
+                        pipeline.get(key)
+                        pipeline.pttl(key)
+                        cached_value, ttl_left_ms = await pipeline.execute()
+                stats.redis_latency.observe(time.monotonic() - started)
+
+                if cached_value is None:
+                    return MISSING
+
+                if early_refresh is not None and _should_refresh(
+                    cache_prefix, ttl_left_ms, early_refresh
+                ):
+                    logger.debug(f"Cache early refresh: '{key}' (ttl_left={ttl_left_ms}ms)")
+                    return MISSING
+
+                value = decode(cached_value)
+                stats.hits += 1
+                logger.debug(f"Cache hit: '{key}'")
+                return value
+            except Exception as exception:
+                logger.warning(f"Cache read failed for key '{key}': {exception}")
+                return MISSING
+
+        async def load(redis: Redis, key: str, *args: P.args, **kwargs: P.kwargs) -> T:
+            logger.debug(f"Cache miss: '{key}'. Executing function")
+            started = time.monotonic()
+            result: T = await func(*args, **kwargs)
+            _compute_times[cache_prefix] = time.monotonic() - started
+            stats.func_latency.observe(_compute_times[cache_prefix])
+
+            try:
+                encoded = cache_serializer.dumps(result)
+                started = time.monotonic()
+
+                if tags:
+                    async with redis.pipeline(transaction=False) as pipeline:
+                        _queue_write(pipeline, key, encoded, ttl, tags)
+                        await pipeline.execute()
+                else:
+                    await redis.setex(key, ttl, encoded)
+
+                stats.redis_latency.observe(time.monotonic() - started)
+                logger.debug(f"Result cached: '{key}' (ttl={ttl})")
+            except Exception as exception:
+                stats.write_failures += 1
+                logger.warning(f"Cache write failed for key '{key}': {exception}")
+
+            return result
+
+        async def load_locked(redis: Redis, key: str, *args: P.args, **kwargs: P.kwargs) -> T:
+            lock_key = f"lock:{key}"
+            token = uuid.uuid4().hex
+
+            try:
+                acquired = bool(await redis.set(lock_key, token, nx=True, px=CACHE_LOCK_TIMEOUT_MS))
+            except Exception as exception:
+                logger.warning(f"Cache lock failed for key '{key}': {exception}")
+                return await load(redis, key, *args, **kwargs)
+
+            if not acquired:
+                logger.debug(f"Cache lock for '{key}' is held by another process, waiting")
+                value = await _wait_for_value(redis, key, lock_key, decode)
+                if value is not MISSING:
+                    return value  # type: ignore[no-any-return]
+
+                return await load(redis, key, *args, **kwargs)
+
+            try:
+                return await load(redis, key, *args, **kwargs)
+            finally:
+                try:
+                    await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)  # type: ignore[misc]
+                except Exception as exception:
+                    logger.warning(f"Cache lock release failed for key '{key}': {exception}")
+
+        async def load_coalesced(redis: Redis, key: str, *args: P.args, **kwargs: P.kwargs) -> T:
+            inflight = _inflight.get(key)
+
+            if inflight is not None:
+                logger.debug(f"Cache miss: '{key}'. Joining in-flight load")
+                try:
+                    shared: T = await asyncio.shield(inflight)
+                    return copy.deepcopy(shared)
+                except asyncio.CancelledError:
+                    if not inflight.cancelled():
+                        raise
+                    # The leader was cancelled, load the value ourselves
+                    return await load_locked(redis, key, *args, **kwargs)
+
+            future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+            _inflight[key] = future
+
+            try:
+                result = await load_locked(redis, key, *args, **kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as exception:
+                future.set_exception(exception)
+                future.exception()  # mark as retrieved when nobody is waiting
+                raise
+            finally:
+                _inflight.pop(key, None)
+
+            future.set_result(result)
+            return result
 
         @wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
@@ -39,33 +232,184 @@ def redis_cache(
             # Build cache key
             key_parts = [
                 "cache",
-                prefix or func.__name__,
+                cache_prefix,
                 *map(str, args[1:]),
                 *map(str, kwargs.values()),
             ]
             key: str = ":".join(key_parts)
 
-            try:
-                cached_value: Optional[bytes] = await redis.get(key)
-                if cached_value is not None:
-                    logger.debug(f"Cache hit: '{key}'")
-                    parsed = json_utils.decode(cached_value.decode())
-                    return type_adapter.validate_python(parsed)
-            except Exception as exception:
-                logger.warning(f"Cache read failed for key '{key}': {exception}")
+            use_local = local_ttl is not None and local_cache.ensure_listener(redis)
+            generation = local_cache.generation
 
-            logger.debug(f"Cache miss: '{key}'. Executing function")
-            result: T = await func(*args, **kwargs)
+            if use_local:
+                local_value = local_cache.get(cache_prefix, key)
+                if local_value is not MISSING:
+                    stats.local_hits += 1
+                    logger.debug(f"Local cache hit: '{key}'")
+                    return local_value  # type: ignore[no-any-return]
 
-            try:
-                safe_result = prepare_for_cache(type_adapter.dump_python(result))
-                await redis.setex(key, ttl, json_utils.encode(safe_result))
-                logger.debug(f"Result cached: '{key}' (ttl={ttl})")
-            except Exception as exception:
-                logger.warning(f"Cache write failed for key '{key}': {exception}")
+            value = await read(redis, key)
+
+            if value is not MISSING:
+                result: T = value
+            else:
+                stats.misses += 1
+                if single_flight:
+                    result = await load_coalesced(redis, key, *args, **kwargs)
+                else:
+                    result = await load(redis, key, *args, **kwargs)
+
+            if use_local:
+                local_cache.set(cache_prefix, key, result, l1_ttl, generation)
 
             return result
 
         return wrapper
 
     return decorator
+
+
+async def invalidate_cache(redis: Redis, *keys: str, tags: Iterable[str] = ()) -> None:
+    tags = list(tags)
+    tag_keys = [build_tag_key(tag) for tag in tags]
+    if not keys and not tag_keys:
+        return
+
+    local_cache.evict(*keys)
+    deleted: list[bytes] = await redis.eval(  # type: ignore[misc]
+        INVALIDATE_SCRIPT,
+        len(tag_keys),
+        *tag_keys,
+        INVALIDATION_CHANNEL,
+        *keys,
+    )
+
+    if tag_keys:
+        local_cache.evict(*(key.decode() for key in deleted))
+
+    logger.debug(f"Cache invalidated: '{len(deleted)}' keys (tags={tags})")
+
+
+def decode_cached(prefix: str, cached_value: bytes) -> Any:
+    return _specs[prefix].serializer.loads(cached_value)
+
+
+async def get_cached_many(redis: Redis, prefix: str, args: Iterable[Any]) -> dict[Any, Any]:
+    # Counterpart of a single-argument redis_cache function: one MGET instead of N GETs.
+    # Missing or undecodable entries are simply left out of the result
+    stats = cache_metrics.get(prefix)
+    keys = {arg: build_key("cache", prefix, arg) for arg in args}
+    if not keys:
+        return {}
+
+    started = time.monotonic()
+    try:
+        cached_values: list[Optional[bytes]] = await redis.mget(list(keys.values()))
+    except Exception as exception:
+        logger.warning(f"Cache batch read failed for prefix '{prefix}': {exception}")
+        return {}
+    stats.redis_latency.observe(time.monotonic() - started)
+
+    result: dict[Any, Any] = {}
+    for (arg, key), cached_value in zip(keys.items(), cached_values):
+        if cached_value is None:
+            stats.misses += 1
+            continue
+
+        try:
+            result[arg] = decode_cached(prefix, cached_value)
+        except Exception as exception:
+            stats.decode_failures += 1
+            stats.misses += 1
+            logger.warning(f"Cache read failed for key '{key}': {exception}")
+            continue
+
+        stats.hits += 1
+
+    logger.debug(f"Cache batch read for prefix '{prefix}': '{len(result)}/{len(keys)}' hits")
+    return result
+
+
+async def set_cached_many(redis: Redis, prefix: str, values: dict[Any, Any]) -> None:
+    if not values:
+        return
+
+    spec = _specs[prefix]
+    stats = cache_metrics.get(prefix)
+    started = time.monotonic()
+
+    try:
+        async with redis.pipeline(transaction=False) as pipeline:
+            for arg, value in values.items():
+                key = build_key("cache", prefix, arg)
+                _queue_write(pipeline, key, spec.serializer.dumps(value), spec.ttl, spec.tags)
+            await pipeline.execute()
+    except Exception as exception:
+        stats.write_failures += 1
+        logger.warning(f"Cache batch write failed for prefix '{prefix}': {exception}")
+        return
+
+    stats.redis_latency.observe(time.monotonic() - started)
+    logger.debug(f"Cache batch write for prefix '{prefix}': '{len(values)}' keys")
+
+
+def build_tag_key(tag: str) -> str:
+    return build_key("cache", "tag", tag)
+
+
+def _queue_write(
+    pipeline: Pipeline,
+    key: str,
+    encoded: bytes,
+    ttl: ExpiryT,
+    tags: Sequence[str],
+) -> None:
+    pipeline.setex(key, ttl, encoded)
+    for tag in tags:
+        tag_key = build_tag_key(tag)
+        pipeline.sadd(tag_key, key)
+        pipeline.expire(tag_key, ttl, nx=True)
+        pipeline.expire(tag_key, ttl, gt=True)
+
+
+def _should_refresh(prefix: str, ttl_left_ms: int, beta: float) -> bool:
+    # Probabilistic early expiration (XFetch): the closer the key is to expiring and the
+    # longer the function takes, the more likely a single caller recomputes it in advance
+    delta = _compute_times.get(prefix)
+    if not delta or ttl_left_ms <= 0:
+        return False
+
+    return -delta * beta * math.log(1.0 - random.random()) * 1000 >= ttl_left_ms
+
+
+async def _wait_for_value(
+    redis: Redis,
+    key: str,
+    lock_key: str,
+    decode: Callable[[bytes], Any],
+) -> Any:
+    deadline = time.monotonic() + CACHE_LOCK_TIMEOUT_MS / 1000
+
+    while time.monotonic() < deadline:
+        await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+
+        try:
+            async with redis.pipeline(transaction=False) as pipeline:
+                pipeline.get(key)
+                pipeline.exists(lock_key)
+                cached_value, is_locked = await pipeline.execute()
+        except Exception as exception:
+            logger.warning(f"Cache wait failed for key '{key}': {exception}")
+            return MISSING
+
+        if cached_value is not None:
+            try:
+                return decode(cached_value)
+            except Exception as exception:
+                logger.warning(f"Cache read failed for key '{key}': {exception}")
+                return MISSING
+
+        if not is_locked:
+            break
+
+    return MISSING
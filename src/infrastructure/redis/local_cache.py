@@ -0,0 +1,123 @@
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Final, Optional
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.constants import CACHE_LOCAL_MAXSIZE
+from src.core.utils import json_utils
+
+INVALIDATION_CHANNEL: Final[str] = "cache:invalidate"
+RESUBSCRIBE_DELAY: Final[int] = 1
+
+MISSING: Final[Any] = object()
+
+
+class LocalCache:
+    _partitions: dict[str, OrderedDict[str, tuple[float, Any]]]
+    _maxsizes: dict[str, int]
+    _generation: int
+    _listener: Optional[asyncio.Task[None]]
+    _ready: asyncio.Event
+
+    def __init__(self) -> None:
+        self._partitions = {}
+        self._maxsizes = {}
+        self._generation = 0
+        self._listener = None
+        self._ready = asyncio.Event()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def configure(self, prefix: str, maxsize: int = CACHE_LOCAL_MAXSIZE) -> None:
+        self._maxsizes[prefix] = maxsize
+        self._partitions.setdefault(prefix, OrderedDict())
+
+    def get(self, prefix: str, key: str) -> Any:
+        partition = self._partitions.get(prefix)
+        if partition is None:
+            return MISSING
+
+        entry = partition.get(key)
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del partition[key]
+            return MISSING
+
+        partition.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, prefix: str, key: str, value: Any, ttl: float, generation: int) -> None:
+        if generation != self._generation:
+            # An invalidation arrived while the value was being loaded, it may be stale
+            return
+
+        partition = self._partitions.setdefault(prefix, OrderedDict())
+        partition[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+        partition.move_to_end(key)
+
+        maxsize = self._maxsizes.get(prefix, CACHE_LOCAL_MAXSIZE)
+        while len(partition) > maxsize:
+            partition.popitem(last=False)
+
+    def evict(self, *keys: str) -> None:
+        self._generation += 1
+        for key in keys:
+            for partition in self._partitions.values():
+                partition.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        for partition in self._partitions.values():
+            partition.clear()
+
+    def ensure_listener(self, redis: Redis) -> bool:
+        if self._listener is None or self._listener.done():
+            self._ready = asyncio.Event()
+            self._listener = asyncio.create_task(self._listen(redis))
+            logger.debug(f"Started local cache invalidation listener on '{INVALIDATION_CHANNEL}'")
+
+        return self._ready.is_set()
+
+    async def _listen(self, redis: Redis) -> None:
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+
+                async for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        self._ready.set()
+                    elif message["type"] == "message":
+                        self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.warning(f"Local cache invalidation listener failed: {exception}")
+            finally:
+                self._ready.clear()
+                self.clear()
+                await pubsub.aclose()
+
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    def _handle_message(self, data: bytes) -> None:
+        try:
+            payload = json_utils.decode(data)
+        except Exception as exception:
+            logger.warning(f"Malformed cache invalidation message '{data!r}': {exception}")
+            self.clear()
+            return
+
+        self.evict(*payload.get("keys", []))
+
+
+local_cache = LocalCache()
@@ -0,0 +1,124 @@
+import bisect
+from typing import Final
+
+LATENCY_BUCKETS: Final[tuple[float, ...]] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class LatencyHistogram:
+    bucket_counts: list[int]
+    count: int
+    total: float
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank:
+                return LATENCY_BUCKETS[min(index, len(LATENCY_BUCKETS) - 1)]
+
+        return LATENCY_BUCKETS[-1]
+
+
+class CacheStats:
+    hits: int
+    local_hits: int
+    misses: int
+    write_failures: int
+    decode_failures: int
+    func_latency: LatencyHistogram
+    redis_latency: LatencyHistogram
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.local_hits = 0
+        self.misses = 0
+        self.write_failures = 0
+        self.decode_failures = 0
+        self.func_latency = LatencyHistogram()
+        self.redis_latency = LatencyHistogram()
+
+
+class CacheMetrics:
+    _stats: dict[str, CacheStats]
+
+    def __init__(self) -> None:
+        self._stats = {}
+
+    def get(self, prefix: str) -> CacheStats:
+        stats = self._stats.get(prefix)
+        if stats is None:
+            stats = self._stats[prefix] = CacheStats()
+        return stats
+
+    def snapshot(self) -> dict[str, CacheStats]:
+        return dict(sorted(self._stats.items()))
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+        snapshot = self.snapshot()
+
+        for name, source in (
+            ("cache_hits_total", "hits"),
+            ("cache_local_hits_total", "local_hits"),
+            ("cache_misses_total", "misses"),
+            ("cache_write_failures_total", "write_failures"),
+            ("cache_decode_failures_total", "decode_failures"),
+        ):
+            lines.append(f"# TYPE {name} counter")
+            for prefix, stats in snapshot.items():
+                lines.append(f'{name}{{prefix="{prefix}"}} {getattr(stats, source)}')
+
+        for name, source in (
+            ("cache_func_seconds", "func_latency"),
+            ("cache_redis_seconds", "redis_latency"),
+        ):
+            lines.append(f"# TYPE {name} histogram")
+            for prefix, stats in snapshot.items():
+                histogram: LatencyHistogram = getattr(stats, source)
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{prefix="{prefix}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{prefix="{prefix}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{prefix="{prefix}"}} {histogram.total}')
+                lines.append(f'{name}_count{{prefix="{prefix}"}} {histogram.count}')
+
+        return "\n".join(lines) + "\n"
+
+
+cache_metrics = CacheMetrics()
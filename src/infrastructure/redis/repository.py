@@ -1,7 +1,19 @@
-from typing import Any, Awaitable, Final, Optional, Set, TypeVar, cast
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Final,
+    Optional,
+    Sequence,
+    Set,
+    TypeVar,
+    cast,
+)
 
 from pydantic import BaseModel, TypeAdapter
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 from redis.typing import ExpiryT
 
 from src.core.config import AppConfig
@@ -11,6 +23,7 @@ from src.core.utils import json_utils
 T = TypeVar("T", bound=Any)
 
 TX_QUEUE_KEY: Final[str] = "tx_queue"
+SCAN_BATCH_SIZE: Final[int] = 500
 
 
 class RedisRepository:
@@ -34,9 +47,39 @@ class RedisRepository:
         return TypeAdapter[T](validator).validate_python(value)
 
     async def set(self, key: StorageKey, value: Any, ex: Optional[ExpiryT] = None) -> None:
-        if isinstance(value, BaseModel):
-            value = value.model_dump(exclude_defaults=True)
-        await self.client.set(name=key.pack(), value=json_utils.encode(value), ex=ex)
+        await self.client.set(name=key.pack(), value=self._encode(value), ex=ex)
+
+    async def get_many(
+        self,
+        keys: Sequence[StorageKey],
+        validator: type[T],
+        default: Optional[T] = None,
+    ) -> list[Optional[T]]:
+        if not keys:
+            return []
+
+        values: list[Optional[bytes]] = await self.client.mget([key.pack() for key in keys])
+        type_adapter = TypeAdapter[T](validator)
+        return [
+            default if value is None else type_adapter.validate_python(json_utils.decode(value))
+            for value in values
+        ]
+
+    async def set_many(
+        self,
+        items: Sequence[tuple[StorageKey, Any]],
+        ex: Optional[ExpiryT] = None,
+    ) -> None:
+        if not items:
+            return
+
+        if ex is None:
+            await self.client.mset({key.pack(): self._encode(value) for key, value in items})
+            return
+
+        async with self.pipeline(transaction=False) as pipeline:
+            for key, value in items:
+                pipeline.set(name=key.pack(), value=self._encode(value), ex=ex)
 
     async def exists(self, key: StorageKey) -> bool:
         return cast(bool, await self.client.exists(key.pack()))
@@ -44,6 +87,42 @@ class RedisRepository:
     async def delete(self, key: StorageKey) -> None:
         await self.client.delete(key.pack())
 
+    async def get_counter(self, key: StorageKey) -> int:
+        value: Optional[bytes] = await self.client.get(key.pack())
+        return int(value) if value is not None else 0
+
+    async def increment(self, key: StorageKey) -> int:
+        return cast(int, await self.client.incr(key.pack()))
+
+    async def delete_many(self, *keys: StorageKey) -> int:
+        if not keys:
+            return 0
+        return cast(int, await self.client.delete(*(key.pack() for key in keys)))
+
+    async def delete_by_pattern(self, pattern: str) -> int:
+        deleted_count = 0
+        batch: list[bytes] = []
+
+        async for key in self.client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                deleted_count += await self.client.unlink(*batch)
+                batch.clear()
+
+        if batch:
+            deleted_count += await self.client.unlink(*batch)
+
+        return deleted_count
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True) -> AsyncIterator[Pipeline]:
+        async with self.client.pipeline(transaction=transaction) as pipeline:
+            yield pipeline
+
+            # Commands queued but not executed by the caller are flushed on exit
+            if pipeline.command_stack:
+                await pipeline.execute()
+
     async def close(self) -> None:
         await self.client.aclose(close_connection_pool=True)
 
@@ -57,6 +136,13 @@ class RedisRepository:
         members_bytes = await cast(Awaitable[Set[bytes]], self.client.smembers(key.pack()))
         return [member.decode() for member in members_bytes]
 
+    async def collection_pop_all(self, key: StorageKey) -> list[str]:
+        async with self.pipeline() as pipeline:
+            pipeline.smembers(key.pack())
+            pipeline.delete(key.pack())
+            members_bytes, _ = await pipeline.execute()
+        return [member.decode() for member in members_bytes]
+
     async def collection_is_member(self, key: StorageKey, value: Any) -> bool:
         return await cast(Awaitable[bool], self.client.sismember(key.pack(), str(value)))
 
@@ -86,6 +172,17 @@ class RedisRepository:
         str_mapping = {str(k): v for k, v in mapping.items()}
         return await cast(Awaitable[int], self.client.zadd(key.pack(), str_mapping))
 
+    async def sorted_collection_add_capped(
+        self,
+        key: StorageKey,
+        mapping: dict[Any, float],
+        max_size: int,
+    ) -> None:
+        str_mapping = {str(k): v for k, v in mapping.items()}
+        async with self.pipeline() as pipeline:
+            pipeline.zadd(key.pack(), str_mapping)
+            pipeline.zremrangebyrank(key.pack(), 0, -max_size - 1)
+
     async def sorted_collection_revrange(self, key: StorageKey, start: int, end: int) -> list[str]:
         items_bytes = await cast(
             Awaitable[list[bytes]], self.client.zrevrange(key.pack(), start, end)
@@ -95,3 +192,10 @@ class RedisRepository:
     async def sorted_collection_remove(self, key: StorageKey, *values: Any) -> int:
         str_values = [str(v) for v in values]
         return await cast(Awaitable[int], self.client.zrem(key.pack(), *str_values))
+
+    #
+
+    def _encode(self, value: Any) -> str:
+        if isinstance(value, BaseModel):
+            value = value.model_dump(exclude_defaults=True)
+        return json_utils.encode(value)
@@ -0,0 +1,119 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from types import NoneType, UnionType
+from typing import Any, Final, Union, get_args, get_origin
+from uuid import UUID
+
+from msgspec import json, msgpack
+from pydantic import BaseModel, SecretStr, TypeAdapter
+
+PLAIN_TYPES: Final[tuple[type, ...]] = (int, float, str, bool, bytes)
+
+_json_encoder: Final[json.Encoder] = json.Encoder()
+_json_decoder: Final[json.Decoder[Any]] = json.Decoder()
+_msgpack_encoder: Final[msgpack.Encoder] = msgpack.Encoder()
+_msgpack_decoder: Final[msgpack.Decoder[Any]] = msgpack.Decoder()
+
+
+def prepare_for_cache(obj: Any) -> Any:
+    if isinstance(obj, SecretStr):
+        return obj.get_secret_value()
+    elif isinstance(obj, dict):
+        return {k: prepare_for_cache(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [prepare_for_cache(v) for v in obj]
+    return obj
+
+
+class CacheSerializer(ABC):
+    type_adapter: TypeAdapter[Any]
+
+    def __init__(self, return_type: Any) -> None:
+        self.return_type = return_type
+        self.type_adapter = TypeAdapter(return_type)
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes: ...
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any: ...
+
+
+class JsonCacheSerializer(CacheSerializer):
+    def dumps(self, value: Any) -> bytes:
+        return _json_encoder.encode(prepare_for_cache(self.type_adapter.dump_python(value)))
+
+    def loads(self, data: bytes) -> Any:
+        return self.type_adapter.validate_python(_json_decoder.decode(data))
+
+
+class MsgpackCacheSerializer(CacheSerializer):
+    # Only for values written by the app itself: models are rebuilt with `model_construct`,
+    # leaf values are coerced by their annotations and nothing is re-validated
+    def dumps(self, value: Any) -> bytes:
+        return _msgpack_encoder.encode(prepare_for_cache(self.type_adapter.dump_python(value)))
+
+    def loads(self, data: bytes) -> Any:
+        return construct(self.return_type, _msgpack_decoder.decode(data))
+
+
+def construct(annotation: Any, value: Any) -> Any:  # noqa: C901
+    if value is None or annotation is Any:
+        return value
+
+    origin = get_origin(annotation)
+
+    if origin in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) == 1:
+            return construct(args[0], value)
+        return _get_adapter(annotation).validate_python(value)
+
+    if origin is list:
+        (item_type,) = get_args(annotation) or (Any,)
+        return [construct(item_type, item) for item in value]
+
+    if origin is dict:
+        key_type, value_type = get_args(annotation) or (Any, Any)
+        return {construct(key_type, k): construct(value_type, v) for k, v in value.items()}
+
+    if not isinstance(annotation, type):
+        return _get_adapter(annotation).validate_python(value)
+
+    if issubclass(annotation, BaseModel):
+        return construct_model(annotation, value)
+    if issubclass(annotation, Enum):
+        return annotation(value)
+    if annotation in PLAIN_TYPES:
+        return value
+    if annotation is datetime:
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+    if annotation is UUID:
+        return UUID(value) if isinstance(value, str) else value
+    if annotation is Decimal:
+        return Decimal(value)
+    if annotation is SecretStr:
+        return SecretStr(value)
+
+    return _get_adapter(annotation).validate_python(value)
+
+
+def construct_model(model: type[BaseModel], data: dict[str, Any]) -> BaseModel:
+    if not model.__pydantic_complete__:
+        return model.model_validate(data)
+
+    fields: dict[str, Any] = {}
+
+    for name, field in model.model_fields.items():
+        if name in data:
+            fields[name] = construct(field.annotation, data[name])
+
+    return model.model_construct(**fields)
+
+
+@lru_cache
+def _get_adapter(annotation: Any) -> TypeAdapter[Any]:
+    return TypeAdapter(annotation)
@@ -1,4 +1,4 @@
-from . import notifications, payments, redirects, referrals, subscriptions, updates
+from . import notifications, payments, redirects, referrals, statistics, subscriptions, updates
 
 __all__ = [
     "notifications",
@@ -7,4 +7,5 @@ __all__ = [
     "subscriptions",
     "updates",
     "referrals",
+    "statistics",
 ]
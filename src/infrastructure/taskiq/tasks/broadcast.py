@@ -1,14 +1,21 @@
 import asyncio
+from contextlib import aclosing
 from typing import Optional, cast
 
 from aiogram import Bot
 from dishka.integrations.taskiq import FromDishka, inject
 from loguru import logger
 
-from src.core.enums import BroadcastMessageStatus, BroadcastStatus
+from src.core.constants import (
+    BROADCAST_BATCH_SIZE,
+    BROADCAST_FLUSH_INTERVAL,
+    BROADCAST_FLUSH_SIZE,
+)
+from src.core.enums import BroadcastAudience, BroadcastMessageStatus, BroadcastStatus
 from src.core.utils.iterables import chunked
 from src.core.utils.message_payload import MessagePayload
-from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto, UserDto
+from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto
+from src.infrastructure.database.models.dto.user import BaseUserDto
 from src.infrastructure.taskiq.broker import broker
 from src.services.broadcast import BroadcastService
 from src.services.notification import NotificationService
@@ -16,38 +23,24 @@ from src.services.notification import NotificationService
 
 @broker.task
 @inject
-async def send_broadcast_task(
+async def send_broadcast_task(  # noqa: C901
     broadcast: BroadcastDto,
-    users: list[UserDto],
+    audience: BroadcastAudience,
+    plan_id: Optional[int],
     payload: MessagePayload,
     notification_service: FromDishka[NotificationService],
     broadcast_service: FromDishka[BroadcastService],
 ) -> None:
     broadcast_id = cast(int, broadcast.id)
-    total_users = len(users)
     loop = asyncio.get_running_loop()
     start_time = loop.time()
+    batch_index = 0
+    success_count = 0
+    failed_count = 0
 
-    logger.info(f"Started sending broadcast '{broadcast_id}', total users: {total_users}")
-
-    try:
-        broadcast_messages = await broadcast_service.create_messages(
-            broadcast_id,
-            [
-                BroadcastMessageDto(user_id=user.telegram_id, status=BroadcastMessageStatus.PENDING)
-                for user in users
-            ],
-        )
-        logger.debug(
-            f"Created '{len(broadcast_messages)}' message DTOs for broadcast '{broadcast_id}'"
-        )
-    except Exception:
-        logger.exception(f"Failed to create message DTOs for broadcast '{broadcast_id}'")
-        broadcast.status = BroadcastStatus.ERROR
-        await broadcast_service.update(broadcast)
-        return
+    logger.info(f"Started sending broadcast '{broadcast_id}', total users: {broadcast.total_count}")
 
-    async def send_message(user: UserDto, message: BroadcastMessageDto) -> None:
+    async def send_message(user: BaseUserDto, message: BroadcastMessageDto) -> None:
         try:
             tg_message = await notification_service.notify_user(user=user, payload=payload)
             if tg_message:
@@ -61,35 +54,70 @@ async def send_broadcast_task(
             )
             message.status = BroadcastMessageStatus.FAILED
 
-    user_message_pairs = list(zip(users, broadcast_messages))
-    last_known_status: Optional[BroadcastStatus] = broadcast.status
-
-    for i, batch in enumerate(chunked(user_message_pairs, 20), start=1):
-        batch_start = loop.time()
-
-        last_known_status = await broadcast_service.get_status(broadcast.task_id)
-        if last_known_status == BroadcastStatus.CANCELED:
-            break
+    async def flush_progress() -> None:
+        nonlocal last_flush
+        broadcast.success_count = success_count
+        broadcast.failed_count = failed_count
+        await broadcast_service.save_progress(broadcast, pending_writes)
+        pending_writes.clear()
+        last_flush = loop.time()
 
-        tasks = [send_message(u, m) for u, m in batch]
-        await asyncio.gather(*tasks)
-
-        _, messages_batch = zip(*batch)
-        await broadcast_service.bulk_update_messages(list(messages_batch))
-
-        batch_elapsed = loop.time() - batch_start
-        logger.info(f"Batch {i}: sent {len(batch)} messages in {batch_elapsed:.2f}s")
+    last_known_status: Optional[BroadcastStatus] = broadcast.status
+    pending_writes: list[BroadcastMessageDto] = []
+    last_flush = loop.time()
 
-        wait_time = 1.0 - batch_elapsed
-        if wait_time > 0:
-            await asyncio.sleep(wait_time)
+    try:
+        broadcast.total_count = await broadcast_service.create_audience_messages(
+            broadcast_id,
+            audience,
+            plan_id,
+        )
+    except Exception:
+        logger.exception(f"Failed to create messages for broadcast '{broadcast_id}'")
+        broadcast.status = BroadcastStatus.ERROR
+        await broadcast_service.update(broadcast)
+        return
 
-    broadcast.success_count = sum(
-        1 for m in broadcast_messages if m.status == BroadcastMessageStatus.SENT
-    )
-    broadcast.failed_count = sum(
-        1 for m in broadcast_messages if m.status == BroadcastMessageStatus.FAILED
-    )
+    pending_pages = broadcast_service.iter_pending_messages(broadcast_id)
+    async with aclosing(pending_pages) as pages:
+        async for page in pages:
+            for batch in chunked(page, BROADCAST_BATCH_SIZE):
+                batch_index += 1
+                batch_start = loop.time()
+
+                last_known_status = await broadcast_service.get_status(broadcast.task_id)
+                if last_known_status == BroadcastStatus.CANCELED:
+                    break
+
+                tasks = [send_message(u, m) for u, m in batch]
+                await asyncio.gather(*tasks)
+
+                messages_batch = [m for _, m in batch]
+                pending_writes.extend(messages_batch)
+                success_count += sum(
+                    1 for m in messages_batch if m.status == BroadcastMessageStatus.SENT
+                )
+                failed_count += sum(
+                    1 for m in messages_batch if m.status == BroadcastMessageStatus.FAILED
+                )
+
+                if (
+                    len(pending_writes) >= BROADCAST_FLUSH_SIZE
+                    or loop.time() - last_flush >= BROADCAST_FLUSH_INTERVAL
+                ):
+                    await flush_progress()
+
+                batch_elapsed = loop.time() - batch_start
+                logger.info(
+                    f"Batch {batch_index}: sent {len(batch)} messages in {batch_elapsed:.2f}s"
+                )
+
+                wait_time = 1.0 - batch_elapsed
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+
+            if last_known_status == BroadcastStatus.CANCELED:
+                break
 
     broadcast.status = (
         BroadcastStatus.CANCELED
@@ -97,7 +125,7 @@ async def send_broadcast_task(
         else BroadcastStatus.COMPLETED
     )
 
-    await broadcast_service.update(broadcast)
+    await flush_progress()
 
     total_elapsed = loop.time() - start_time
     logger.info(
@@ -116,13 +144,14 @@ async def delete_broadcast_task(
     broadcast_id = cast(int, broadcast.id)
     logger.info(f"Started deleting messages for broadcast '{broadcast_id}'")
 
-    if not broadcast.messages:
+    messages = await broadcast_service.get_messages(broadcast_id)
+    if not messages:
         logger.error(f"Messages list is empty for broadcast '{broadcast_id}', aborting")
         raise ValueError(f"Broadcast '{broadcast_id}' messages is empty")
 
     deleted_count = 0
     failed_count = 0
-    total_messages = len(broadcast.messages)
+    total_messages = len(messages)
     loop = asyncio.get_running_loop()
     start_time = loop.time()
 
@@ -146,14 +175,14 @@ async def delete_broadcast_task(
             logger.exception(f"Exception deleting message for user '{user_id}'. ID: '{message_id}'")
         return message
 
-    for i, batch in enumerate(chunked(broadcast.messages, 20), start=1):
+    for i, batch in enumerate(chunked(messages, BROADCAST_BATCH_SIZE), start=1):
         batch_start = loop.time()
         tasks = [delete_message(m) for m in batch]
         results = await asyncio.gather(*tasks)
 
         deleted_count += sum(1 for m in results if m.status == BroadcastMessageStatus.DELETED)
         failed_count += sum(1 for m in results if m.status != BroadcastMessageStatus.DELETED)
-        await broadcast_service.bulk_update_messages(results)
+        await broadcast_service.update_messages_status(broadcast_id, results)
 
         batch_elapsed = loop.time() - batch_start
         logger.info(f"Batch {i}: processed {len(batch)} messages in {batch_elapsed:.2f}s")
@@ -173,16 +202,11 @@ async def delete_broadcast_task(
 
 @broker.task(schedule=[{"cron": "0 0 */7 * *"}])
 @inject
-async def delete_broadcasts_task(broadcast_service: FromDishka[BroadcastService]) -> None:
-    broadcasts = await broadcast_service.get_all()
-
-    if not broadcasts:
-        logger.debug("No broadcasts found to delete")
-        return
-
-    old_broadcasts = [bc for bc in broadcasts if bc.has_old]
-    logger.debug(f"Found '{len(old_broadcasts)}' old broadcasts to delete")
-
-    for broadcast in old_broadcasts:
-        await broadcast_service.delete_broadcast(broadcast.id)  # type: ignore[arg-type]
-        logger.debug(f"Broadcast '{broadcast.id}' deleted")
+async def delete_broadcasts_task(
+    broadcast_service: FromDishka[BroadcastService],
+) -> dict[str, int]:
+    deleted_broadcasts, dropped_partitions = await broadcast_service.delete_old()
+    return {
+        "deleted_broadcasts": deleted_broadcasts,
+        "dropped_partitions": dropped_partitions,
+    }
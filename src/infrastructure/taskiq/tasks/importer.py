@@ -6,7 +6,10 @@ from remnapy import RemnawaveSDK
 from remnapy.exceptions import BadRequestError
 from remnapy.models import CreateUserRequestDto, UserResponseDto
 
+from src.core.constants import SYNC_CHUNK_SIZE
 from src.core.storage.keys import SyncRunningKey
+from src.core.utils.iterables import chunked
+from src.infrastructure.database import UnitOfWork
 from src.infrastructure.redis.repository import RedisRepository
 from src.infrastructure.taskiq.broker import broker
 from src.services.remnawave import RemnawaveService
@@ -47,8 +50,9 @@ async def import_exported_users_task(
 
 @broker.task(retry_on_error=False)
 @inject
-async def sync_all_users_from_panel_task(
+async def sync_all_users_from_panel_task(  # noqa: C901
     redis_repository: FromDishka[RedisRepository],
+    uow: FromDishka[UnitOfWork],
     remnawave: FromDishka[RemnawaveSDK],
     remnawave_service: FromDishka[RemnawaveService],
     user_service: FromDishka[UserService],
@@ -73,11 +77,16 @@ async def sync_all_users_from_panel_task(
         if len(response.users) < size:
             break
 
-    bot_users = await user_service.get_all()
-    bot_users_map = {user.telegram_id: user for user in bot_users}
+    bot_telegram_ids = set(await user_service.get_all_ids())
 
     logger.info(f"Total users in panel: '{len(all_remna_users)}'")
-    logger.info(f"Total users in bot: '{len(bot_users)}'")
+    logger.info(f"Total users in bot: '{len(bot_telegram_ids)}'")
+
+    current_subscriptions = await subscription_service.get_current_many(
+        remna_user.telegram_id
+        for remna_user in all_remna_users
+        if remna_user.telegram_id and remna_user.telegram_id in bot_telegram_ids
+    )
 
     added_users = 0
     added_subscription = 0
@@ -86,35 +95,57 @@ async def sync_all_users_from_panel_task(
     missing_telegram = 0
 
     try:
-        for remna_user in all_remna_users:
-            try:
-                if not remna_user.telegram_id:
-                    missing_telegram += 1
-                    continue
+        to_import: list[UserResponseDto] = []
 
-                user = bot_users_map.get(remna_user.telegram_id)
-
-                if not user:
+        for remna_user in all_remna_users:
+            if not remna_user.telegram_id:
+                missing_telegram += 1
+                continue
+
+            is_bot_user = remna_user.telegram_id in bot_telegram_ids
+            if not is_bot_user or not current_subscriptions.get(remna_user.telegram_id):
+                to_import.append(remna_user)
+            else:
+                try:
                     await remnawave_service.sync_user(remna_user)
-                    added_users += 1
-                else:
-                    current_subscription = await subscription_service.get_current(user.telegram_id)
-                    if not current_subscription:
-                        await remnawave_service.sync_user(remna_user)
+                    updated += 1
+                except Exception as exception:
+                    logger.exception(
+                        f"Error syncing RemnaUser '{remna_user.telegram_id}' exception: {exception}"
+                    )
+                    errors += 1
+
+        for chunk in chunked(to_import, SYNC_CHUNK_SIZE):
+            try:
+                await remnawave_service.import_users(chunk, bot_telegram_ids)
+                for remna_user in chunk:
+                    if remna_user.telegram_id in bot_telegram_ids:
                         added_subscription += 1
                     else:
-                        await remnawave_service.sync_user(remna_user)
-                        updated += 1
-
+                        added_users += 1
             except Exception as exception:
-                logger.exception(
-                    f"Error syncing RemnaUser '{remna_user.telegram_id}' exception: {exception}"
-                )
-                errors += 1
+                logger.warning(f"Bulk import of '{len(chunk)}' users failed: {exception}")
+                await uow.rollback()
+
+                # Fall back to one user at a time so a single bad row doesn't drop the chunk
+                for remna_user in chunk:
+                    try:
+                        await remnawave_service.sync_user(remna_user)
+                        if remna_user.telegram_id in bot_telegram_ids:
+                            added_subscription += 1
+                        else:
+                            added_users += 1
+                    except Exception as exception:
+                        logger.exception(
+                            f"Error syncing RemnaUser '{remna_user.telegram_id}' "
+                            f"exception: {exception}"
+                        )
+                        await uow.rollback()
+                        errors += 1
 
         result = {
             "total_panel_users": len(all_remna_users),
-            "total_bot_users": len(bot_users),
+            "total_bot_users": len(bot_telegram_ids),
             "added_users": added_users,
             "added_subscription": added_subscription,
             "updated": updated,
@@ -1,7 +1,6 @@
 from uuid import UUID
 
 from dishka.integrations.taskiq import FromDishka, inject
-from loguru import logger
 
 from src.core.enums import TransactionStatus
 from src.infrastructure.taskiq.broker import broker
@@ -25,17 +24,8 @@ async def handle_payment_transaction_task(
 
 @broker.task(schedule=[{"cron": "*/30 * * * *"}])
 @inject
-async def cancel_transaction_task(transaction_service: FromDishka[TransactionService]) -> None:
-    transactions = await transaction_service.get_by_status(TransactionStatus.PENDING)
-
-    if not transactions:
-        logger.debug("No pending transactions found")
-        return
-
-    old_transactions = [tx for tx in transactions if tx.has_old]
-    logger.debug(f"Found '{len(old_transactions)}' old transactions to cancel")
-
-    for transaction in old_transactions:
-        transaction.status = TransactionStatus.CANCELED
-        await transaction_service.update(transaction)
-        logger.debug(f"Transaction '{transaction.id}' canceled")
+async def cancel_transaction_task(
+    transaction_service: FromDishka[TransactionService],
+) -> dict[str, int]:
+    canceled = await transaction_service.cancel_stale_pending()
+    return {"canceled_transactions": canceled}
@@ -0,0 +1,16 @@
+from dishka.integrations.taskiq import FromDishka, inject
+
+from src.infrastructure.taskiq.broker import broker
+from src.services.statistics import StatisticsService
+
+
+@broker.task(schedule=[{"cron": "*/15 * * * *"}], retry_on_error=False)
+@inject
+async def rollup_statistics_task(statistics_service: FromDishka[StatisticsService]) -> None:
+    await statistics_service.rollup()
+
+
+@broker.task(schedule=[{"cron": "30 0 * * *"}], retry_on_error=False)
+@inject
+async def reroll_statistics_task(statistics_service: FromDishka[StatisticsService]) -> None:
+    await statistics_service.rollup(reroll_recent=True)
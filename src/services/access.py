@@ -101,8 +101,7 @@ class AccessService(BaseService):
                 payload=MessagePayload(i18n_key="ntf-access-denied-purchasing"),
             )
 
-            if await self._can_add_to_waitlist(user.telegram_id):
-                await self.add_user_to_waitlist(user.telegram_id)
+            await self.add_user_to_waitlist(user.telegram_id)
 
             return False
 
@@ -134,14 +133,11 @@ class AccessService(BaseService):
         await self.settings_service.set_access_mode(mode)
         logger.info(f"Access mode changed to '{mode}'")
 
-        if mode in (AccessMode.PUBLIC, AccessMode.INVITED):
-            waiting_users = await self.get_all_waiting_users()
+        waiting_users = await self.pop_all_waiting_users()
 
-            if waiting_users:
-                logger.info(f"Notifying '{len(waiting_users)}' waiting users about access opening")
-                await send_access_opened_notifications_task.kiq(waiting_users)
-
-        await self.clear_all_waiting_users()
+        if mode in (AccessMode.PUBLIC, AccessMode.INVITED) and waiting_users:
+            logger.info(f"Notifying '{len(waiting_users)}' waiting users about access opening")
+            await send_access_opened_notifications_task.kiq(waiting_users)
 
     async def add_user_to_waitlist(self, telegram_id: int) -> bool:
         added_count = await self.redis_repository.collection_add(AccessWaitListKey(), telegram_id)
@@ -166,29 +162,12 @@ class AccessService(BaseService):
         logger.debug(f"User '{telegram_id}' not found in access waitlist")
         return False
 
-    async def get_all_waiting_users(self) -> list[int]:
-        members_str = await self.redis_repository.collection_members(key=AccessWaitListKey())
+    async def pop_all_waiting_users(self) -> list[int]:
+        members_str = await self.redis_repository.collection_pop_all(key=AccessWaitListKey())
         users = [int(member) for member in members_str]
-        logger.debug(f"Retrieved '{len(users)}' users from access waitlist")
+        logger.info(f"Access waitlist cleared, popped '{len(users)}' users")
         return users
 
-    async def clear_all_waiting_users(self) -> None:
-        await self.redis_repository.delete(key=AccessWaitListKey())
-        logger.info("Access waitlist completely cleared")
-
-    async def _can_add_to_waitlist(self, telegram_id: int) -> bool:
-        is_member = await self.redis_repository.collection_is_member(
-            key=AccessWaitListKey(),
-            value=telegram_id,
-        )
-
-        if is_member:
-            logger.debug(f"User '{telegram_id}' already in access waitlist")
-            return False
-
-        logger.debug(f"User '{telegram_id}' can be added to access waitlist")
-        return True
-
     def _is_purchase_action(self, event: TelegramObject) -> bool:
         if not isinstance(event, CallbackQuery) or not event.data:
             return False
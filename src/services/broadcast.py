@@ -1,22 +1,36 @@
-from typing import Optional
+from datetime import timedelta
+from typing import AsyncIterator, Optional, cast
 from uuid import UUID
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
 from loguru import logger
 from redis.asyncio import Redis
-from sqlalchemy import and_
+from sqlalchemy import ColumnElement, select
 
 from src.core.config import AppConfig
+from src.core.constants import (
+    AUDIENCE_CHUNK_SIZE,
+    BROADCAST_RETENTION_DAYS,
+    MAINTENANCE_CHUNK_SIZE,
+)
 from src.core.enums import (
     BroadcastAudience,
+    BroadcastMessageStatus,
     BroadcastStatus,
     PlanAvailability,
     SubscriptionStatus,
 )
+from src.core.utils.time import datetime_now
 from src.infrastructure.database import UnitOfWork
-from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto, UserDto
-from src.infrastructure.database.models.sql import Broadcast, BroadcastMessage, Subscription, User
+from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto
+from src.infrastructure.database.models.dto.user import BaseUserDto
+from src.infrastructure.database.models.sql import (
+    Broadcast,
+    Subscription,
+    User,
+    json_integer,
+)
 from src.infrastructure.database.models.sql.plan import Plan
 from src.infrastructure.redis import RedisRepository
 
@@ -46,21 +60,24 @@ class BroadcastService(BaseService):
         logger.info(f"Created broadcast '{broadcast.task_id}'")
         return BroadcastDto.from_model(db_created_broadcast)  # type: ignore[return-value]
 
-    async def create_messages(
+    async def create_audience_messages(
         self,
         broadcast_id: int,
-        messages: list[BroadcastMessageDto],
-    ) -> list[BroadcastMessageDto]:
-        db_messages = [
-            BroadcastMessage(
-                broadcast_id=broadcast_id,
-                user_id=m.user_id,
-                status=m.status,
-            )
-            for m in messages
-        ]
-        db_created_messages = await self.uow.repository.broadcasts.create_messages(db_messages)
-        return BroadcastMessageDto.from_model_list(db_created_messages)
+        audience: BroadcastAudience,
+        plan_id: Optional[int] = None,
+    ) -> int:
+        # Creating a partition locks the whole table, so it is committed before the long insert
+        await self.uow.repository.broadcasts.create_messages_partition(broadcast_id)
+        await self.uow.commit()
+
+        conditions = self._get_audience_conditions(audience, plan_id)
+        count = await self.uow.repository.broadcasts.create_messages_for_users(
+            broadcast_id,
+            *conditions,
+        )
+        await self.uow.commit()
+        logger.info(f"Created '{count}' pending messages for broadcast '{broadcast_id}'")
+        return count
 
     async def get(self, task_id: UUID) -> Optional[BroadcastDto]:
         db_broadcast = await self.uow.repository.broadcasts.get(task_id)
@@ -96,20 +113,98 @@ class BroadcastService(BaseService):
         await self.uow.repository.broadcasts.update_message(
             broadcast_id=broadcast_id,
             user_id=message.user_id,
+            load_result=False,
             **message.changed_data,
         )
 
-    async def bulk_update_messages(self, messages: list[BroadcastMessageDto]) -> None:
-        await self.uow.repository.broadcasts.bulk_update_messages(
-            data=[m.model_dump() for m in messages],
+    async def update_messages_status(
+        self,
+        broadcast_id: int,
+        messages: list[BroadcastMessageDto],
+    ) -> None:
+        by_status: dict[BroadcastMessageStatus, list[int]] = {}
+        deliveries: dict[BroadcastMessageStatus, list[tuple[int, Optional[int]]]] = {}
+
+        for message in messages:
+            message_id = cast(int, message.id)
+            if "message_id" in message.changed_data:
+                deliveries.setdefault(message.status, []).append((message_id, message.message_id))
+            else:
+                by_status.setdefault(message.status, []).append(message_id)
+
+        for status, message_ids in by_status.items():
+            await self.uow.repository.broadcasts.update_messages_status(
+                broadcast_id,
+                status,
+                message_ids,
+            )
+
+        for status, delivered in deliveries.items():
+            await self.uow.repository.broadcasts.update_messages_delivery(
+                broadcast_id,
+                status,
+                delivered,
+            )
+
+        logger.debug(
+            f"Updated status of '{len(messages)}' broadcast messages "
+            f"in '{len(by_status) + len(deliveries)}' statements"
         )
 
-    async def delete_broadcast(self, broadcast_id: int) -> None:
-        await self.uow.repository.broadcasts._delete(Broadcast, Broadcast.id == broadcast_id)
+    async def save_progress(
+        self,
+        broadcast: BroadcastDto,
+        messages: list[BroadcastMessageDto],
+    ) -> None:
+        await self.update_messages_status(cast(int, broadcast.id), messages)
+        # Counters only, loading the row back would be wasted on every flush
+        await self.uow.repository.broadcasts.update(
+            task_id=broadcast.task_id,
+            load_result=False,
+            status=broadcast.status,
+            total_count=broadcast.total_count,
+            success_count=broadcast.success_count,
+            failed_count=broadcast.failed_count,
+        )
+        await self.uow.commit()
+
+    async def delete_old(self) -> tuple[int, int]:
+        created_before = datetime_now() - timedelta(days=BROADCAST_RETENTION_DAYS)
+        repository = self.uow.repository.broadcasts
+        dropped_partitions = 0
+        deleted_broadcasts = 0
+
+        # Messages live in a partition per broadcast: it is detached without blocking the
+        # table, after that dropping it touches nothing but the detached table
+        broadcast_ids = await repository.get_old_ids(created_before)
+        for broadcast_id in broadcast_ids:
+            if await repository.detach_messages_partition(broadcast_id):
+                dropped_partitions += 1
+
+            await repository.drop_messages_partition(broadcast_id)
+            await self.uow.commit()
+
+        while True:
+            count = await repository.delete_old(created_before, MAINTENANCE_CHUNK_SIZE)
+            await self.uow.commit()
+            deleted_broadcasts += count
+
+            if count < MAINTENANCE_CHUNK_SIZE:
+                break
+
+        logger.info(
+            f"Deleted '{deleted_broadcasts}' broadcasts and dropped '{dropped_partitions}' "
+            f"message partitions created before '{created_before}'"
+        )
+        return deleted_broadcasts, dropped_partitions
 
     async def get_status(self, task_id: UUID) -> Optional[BroadcastStatus]:
-        db_broadcast = await self.uow.repository.broadcasts.get(task_id)
-        return db_broadcast.status if db_broadcast else None
+        return await self.uow.repository.broadcasts.get_status(task_id)
+
+    async def get_messages(self, broadcast_id: int) -> list[BroadcastMessageDto]:
+        db_messages = await self.uow.repository.broadcasts.get_messages(broadcast_id)
+        logger.debug(f"Retrieved '{len(db_messages)}' messages for broadcast '{broadcast_id}'")
+        return BroadcastMessageDto.from_model_list(db_messages)
 
     #
 
@@ -120,122 +215,82 @@ class BroadcastService(BaseService):
     ) -> int:
         logger.debug(f"Counting audience '{audience}' for plan '{plan_id}'")
 
-        is_not_block = and_(
-            User.is_blocked.is_(False),
-            User.is_bot_blocked.is_(False),
-        )
-
-        if audience == BroadcastAudience.PLAN:
-            if plan_id:
-                db_subs = await self.uow.repository.subscriptions.filter_by_plan_id(plan_id)
-                active_subs = [
-                    s
-                    for s in db_subs
-                    if s.status == SubscriptionStatus.ACTIVE
-                    and not s.user.is_blocked
-                    and not s.user.is_bot_blocked
-                ]
-                return len(active_subs)
-
-            count = await self.uow.repository.plans._count(
+        if audience == BroadcastAudience.PLAN and not plan_id:
+            count = await self.uow.replica.plans._count(
                 Plan,
                 Plan.availability != PlanAvailability.TRIAL,
             )
             logger.debug(f"Audience count for '{audience}' (plan={plan_id}) is '{count}'")
             return count
 
-        if audience == BroadcastAudience.ALL:
-            return await self.uow.repository.users._count(User, is_not_block)
-
-        if audience == BroadcastAudience.SUBSCRIBED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.ACTIVE),
-            )
-            return await self.uow.repository.users._count(User, conditions)
-
-        if audience == BroadcastAudience.UNSUBSCRIBED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription_id.is_(None),
-            )
-            return await self.uow.repository.users._count(User, conditions)
+        conditions = self._get_audience_conditions(audience, plan_id)
+        return await self.uow.replica.users._count(User, *conditions)
 
-        if audience == BroadcastAudience.EXPIRED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.EXPIRED),
+    async def iter_pending_messages(
+        self,
+        broadcast_id: int,
+        chunk_size: int = AUDIENCE_CHUNK_SIZE,
+    ) -> AsyncIterator[list[tuple[BaseUserDto, BroadcastMessageDto]]]:
+        logger.debug(f"Streaming pending messages for broadcast '{broadcast_id}'")
+        after_id: Optional[int] = None
+
+        while True:
+            page = await self.uow.repository.broadcasts.get_pending_messages_page(
+                broadcast_id,
+                after_id=after_id,
+                limit=chunk_size,
             )
-            return await self.uow.repository.users._count(User, conditions)
+            if not page:
+                return
+
+            yield [
+                (
+                    BaseUserDto(telegram_id=telegram_id, language=language, name=name),
+                    BroadcastMessageDto(
+                        id=message_id,
+                        user_id=telegram_id,
+                        status=BroadcastMessageStatus.PENDING,
+                    ),
+                )
+                for message_id, telegram_id, language, name in page
+            ]
 
-        if audience == BroadcastAudience.TRIAL:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.is_trial.is_(True)),
-            )
-            return await self.uow.repository.users._count(User, conditions)
+            if len(page) < chunk_size:
+                return
 
-        raise Exception(f"Unknown broadcast audience: {audience}")
+            after_id = page[-1][0]
 
-    async def get_audience_users(
+    def _get_audience_conditions(
         self,
         audience: BroadcastAudience,
         plan_id: Optional[int] = None,
-    ) -> list[UserDto]:
-        logger.debug(f"Retrieving users for audience '{audience}', plan_id: {plan_id}")
-
-        is_not_block = and_(
+    ) -> list[ColumnElement[bool]]:
+        conditions: list[ColumnElement[bool]] = [
             User.is_blocked.is_(False),
             User.is_bot_blocked.is_(False),
-        )
+        ]
 
         if audience == BroadcastAudience.PLAN and plan_id:
-            db_subscriptions = await self.uow.repository.subscriptions.filter_by_plan_id(plan_id)
-            active_subs = [
-                s
-                for s in db_subscriptions
-                if s.status == SubscriptionStatus.ACTIVE
-                and not s.user.is_blocked
-                and not s.user.is_bot_blocked
-            ]
-            user_ids = [sub.user_telegram_id for sub in active_subs]
-            db_users = await self.uow.repository.users.get_by_ids(telegram_ids=user_ids)
-            logger.debug(
-                f"Retrieved '{len(db_users)}' users for audience '{audience}' (plan={plan_id})"
-            )
-            return UserDto.from_model_list(db_users)
-
-        if audience == BroadcastAudience.ALL:
-            db_users = await self.uow.repository.users._get_many(User, is_not_block)
-            return UserDto.from_model_list(db_users)
-
-        if audience == BroadcastAudience.SUBSCRIBED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.ACTIVE),
+            plan_subscribers = select(Subscription.user_telegram_id).where(
+                json_integer(Subscription.plan, "id") == plan_id,
+                Subscription.status == SubscriptionStatus.ACTIVE,
             )
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
-
-        if audience == BroadcastAudience.UNSUBSCRIBED:
-            conditions = and_(is_not_block, User.current_subscription_id.is_(None))
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
-
-        if audience == BroadcastAudience.EXPIRED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.EXPIRED),
+            conditions.append(User.telegram_id.in_(plan_subscribers))
+        elif audience == BroadcastAudience.ALL:
+            pass
+        elif audience == BroadcastAudience.SUBSCRIBED:
+            conditions.append(
+                User.current_subscription.has(Subscription.status == SubscriptionStatus.ACTIVE)
             )
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
-
-        if audience == BroadcastAudience.TRIAL:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.is_trial.is_(True)),
+        elif audience == BroadcastAudience.UNSUBSCRIBED:
+            conditions.append(User.current_subscription_id.is_(None))
+        elif audience == BroadcastAudience.EXPIRED:
+            conditions.append(
+                User.current_subscription.has(Subscription.status == SubscriptionStatus.EXPIRED)
             )
-            db_users = await self.uow.repository.users._get_many(User, conditions)
-            return UserDto.from_model_list(db_users)
+        elif audience == BroadcastAudience.TRIAL:
+            conditions.append(User.current_subscription.has(Subscription.is_trial.is_(True)))
+        else:
+            raise Exception(f"Unknown broadcast audience: {audience}")
 
-        raise Exception(f"Unknown broadcast audience: {audience}")
+        return conditions
@@ -79,8 +79,7 @@ class ReferralService(BaseService):
             )
         )
 
-        await self.user_service.clear_user_cache(referrer.telegram_id)
-        await self.user_service.clear_user_cache(referred.telegram_id)
+        await self.user_service.clear_users_cache([referrer.telegram_id, referred.telegram_id])
         logger.info(f"Referral created: {referrer.telegram_id} -> {referred.telegram_id}")
         return ReferralDto.from_model(referral)  # type: ignore[return-value]
 
@@ -147,7 +146,11 @@ class ReferralService(BaseService):
     #
 
     async def mark_reward_as_issued(self, reward_id: int) -> None:
-        await self.uow.repository.referrals.update_reward(reward_id, is_issued=True)
+        await self.uow.repository.referrals.update_reward(
+            reward_id,
+            load_result=False,
+            is_issued=True,
+        )
         logger.info(f"Marked reward '{reward_id}' as issued")
 
     async def handle_referral(self, user: UserDto, code: Optional[str]) -> None:
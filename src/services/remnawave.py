@@ -321,40 +321,7 @@ class RemnawaveService(BaseService):
 
         if not subscription:
             logger.info(f"No subscription found for '{user.telegram_id}', creating")
-
-            temp_plan = PlanSnapshotDto(
-                id=-1,
-                name=IMPORTED_TAG,
-                tag=remna_subscription.tag,
-                type=format_limits_to_plan_type(
-                    remna_subscription.traffic_limit,
-                    remna_subscription.device_limit,
-                ),
-                traffic_limit=remna_subscription.traffic_limit,
-                device_limit=remna_subscription.device_limit,
-                duration=-1,
-                traffic_limit_strategy=remna_subscription.traffic_limit_strategy,
-                internal_squads=remna_subscription.internal_squads,
-                external_squad=remna_subscription.external_squad,
-            )
-
-            expired = remna_user.expire_at and remna_user.expire_at < datetime_now()
-            status = SubscriptionStatus.EXPIRED if expired else remna_user.status
-
-            subscription = SubscriptionDto(
-                user_remna_id=remna_user.uuid,
-                status=status,
-                traffic_limit=temp_plan.traffic_limit,
-                device_limit=temp_plan.device_limit,
-                traffic_limit_strategy=temp_plan.traffic_limit_strategy,
-                tag=temp_plan.tag,
-                internal_squads=remna_subscription.internal_squads,
-                external_squad=remna_subscription.external_squad,
-                expire_at=remna_user.expire_at,
-                url=remna_subscription.url,
-                plan=temp_plan,
-            )
-
+            subscription = self._build_imported_subscription(remna_user, remna_subscription)
             await self.subscription_service.create(user, subscription)
             logger.info(f"Subscription created for '{user.telegram_id}'")
 
@@ -369,6 +336,66 @@ class RemnawaveService(BaseService):
 
         logger.info(f"Sync completed for user '{remna_user.telegram_id}'")
 
+    async def import_users(
+        self,
+        remna_users: list[RemnaUserDto],
+        existing_telegram_ids: set[int],
+    ) -> None:
+        new_users = [u for u in remna_users if u.telegram_id not in existing_telegram_ids]
+        if new_users:
+            await self.user_service.create_from_panel_many(new_users)
+
+        # Panel listings already carry the subscription URL, no per-user lookup is needed
+        subscriptions: list[tuple[int, SubscriptionDto]] = []
+        for remna_user in remna_users:
+            remna_subscription = RemnaSubscriptionDto.from_remna_user(remna_user)
+            subscription = self._build_imported_subscription(remna_user, remna_subscription)
+            subscriptions.append((remna_user.telegram_id, subscription))  # type: ignore[arg-type]
+
+        await self.subscription_service.create_many(subscriptions)
+        logger.info(
+            f"Imported '{len(subscriptions)}' subscriptions from panel, "
+            f"'{len(new_users)}' of them for new users"
+        )
+
+    def _build_imported_subscription(
+        self,
+        remna_user: RemnaUserDto,
+        remna_subscription: RemnaSubscriptionDto,
+    ) -> SubscriptionDto:
+        temp_plan = PlanSnapshotDto(
+            id=-1,
+            name=IMPORTED_TAG,
+            tag=remna_subscription.tag,
+            type=format_limits_to_plan_type(
+                remna_subscription.traffic_limit,
+                remna_subscription.device_limit,
+            ),
+            traffic_limit=remna_subscription.traffic_limit,
+            device_limit=remna_subscription.device_limit,
+            duration=-1,
+            traffic_limit_strategy=remna_subscription.traffic_limit_strategy,
+            internal_squads=remna_subscription.internal_squads,
+            external_squad=remna_subscription.external_squad,
+        )
+
+        expired = remna_user.expire_at and remna_user.expire_at < datetime_now()
+        status = SubscriptionStatus.EXPIRED if expired else remna_user.status
+
+        return SubscriptionDto(
+            user_remna_id=remna_user.uuid,
+            status=status,
+            traffic_limit=temp_plan.traffic_limit,
+            device_limit=temp_plan.device_limit,
+            traffic_limit_strategy=temp_plan.traffic_limit_strategy,
+            tag=temp_plan.tag,
+            internal_squads=remna_subscription.internal_squads,
+            external_squad=remna_subscription.external_squad,
+            expire_at=remna_user.expire_at,
+            url=remna_subscription.url,
+            plan=temp_plan,
+        )
+
     #
 
     async def handle_user_event(self, event: str, remna_user: RemnaUserDto) -> None:  # noqa: C901
@@ -1,4 +1,7 @@
-from typing import Any
+import asyncio
+import copy
+import time
+from typing import Any, Final, Optional
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
@@ -6,21 +9,86 @@ from loguru import logger
 from redis.asyncio import Redis
 
 from src.core.config import AppConfig
-from src.core.constants import TIME_10M
+from src.core.constants import SETTINGS_MAX_STALENESS, SETTINGS_REVALIDATE_INTERVAL, TIME_10M
 from src.core.enums import AccessMode, Currency, SystemNotificationType, UserNotificationType
 from src.core.storage.key_builder import build_key
+from src.core.storage.keys import SettingsVersionKey
 from src.core.utils.types import AnyNotification
-from src.infrastructure.database import UnitOfWork
+from src.infrastructure.database import IdentityMap, UnitOfWork
 from src.infrastructure.database.models.dto import ReferralSettingsDto, SettingsDto
 from src.infrastructure.database.models.sql import Settings
 from src.infrastructure.redis import RedisRepository
-from src.infrastructure.redis.cache import redis_cache
+from src.infrastructure.redis.cache import decode_cached, invalidate_cache, redis_cache
+from src.infrastructure.redis.serializers import MsgpackCacheSerializer
 
 from .base import BaseService
 
+SETTINGS_CACHE_PREFIX: Final[str] = "get_settings"
+
+
+class SettingsSnapshot:
+    _value: Optional[SettingsDto]
+    _version: int
+    _checked_at: float
+    _refresh: Optional[asyncio.Task[None]]
+
+    def __init__(self) -> None:
+        self._value = None
+        self._version = 0
+        self._checked_at = 0.0
+        self._refresh = None
+
+    def get(self) -> Optional[SettingsDto]:
+        if self._value is None or self._age > SETTINGS_MAX_STALENESS:
+            return None
+        return copy.deepcopy(self._value)
+
+    def is_fresh(self) -> bool:
+        return self._age < SETTINGS_REVALIDATE_INTERVAL
+
+    def store(self, value: SettingsDto, version: int) -> None:
+        self._value = copy.deepcopy(value)
+        self._version = version
+        self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        self._value = None
+
+    def revalidate_in_background(self, redis_repository: RedisRepository) -> None:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._revalidate(redis_repository))
+
+    @property
+    def _age(self) -> float:
+        return time.monotonic() - self._checked_at
+
+    async def _revalidate(self, redis_repository: RedisRepository) -> None:
+        try:
+            version = await redis_repository.get_counter(SettingsVersionKey())
+            if version == self._version:
+                self._checked_at = time.monotonic()
+                return
+
+            # Only the shared cache is consulted here, the request session is gone by now
+            cached_value = await redis_repository.client.get(
+                build_key("cache", SETTINGS_CACHE_PREFIX)
+            )
+            if cached_value is None:
+                self.invalidate()
+                return
+
+            self.store(decode_cached(SETTINGS_CACHE_PREFIX, cached_value), version)
+            logger.debug(f"Settings snapshot refreshed to version '{version}'")
+        except Exception as exception:
+            logger.warning(f"Settings snapshot revalidation failed: {exception}")
+
+
+settings_snapshot = SettingsSnapshot()
+
 
 class SettingsService(BaseService):
     uow: UnitOfWork
+    identity_map: IdentityMap
 
     def __init__(
         self,
@@ -31,21 +99,54 @@ class SettingsService(BaseService):
         translator_hub: TranslatorHub,
         #
         uow: UnitOfWork,
+        identity_map: IdentityMap,
     ) -> None:
         super().__init__(config, bot, redis_client, redis_repository, translator_hub)
         self.uow = uow
+        self.identity_map = identity_map
 
     async def create(self) -> SettingsDto:
         settings = SettingsDto()
         db_settings = Settings(**settings.prepare_init_data())
         db_settings = await self.uow.repository.settings.create(db_settings)
+        await self.uow.commit()
 
         await self._clear_cache()
         logger.info("Default settings created in DB")
-        return SettingsDto.from_model(db_settings)  # type: ignore[return-value]
 
-    @redis_cache(prefix="get_settings", ttl=TIME_10M)
+        created_settings = SettingsDto.from_model(db_settings)
+        self.identity_map.set(SettingsDto, None, created_settings)
+        return created_settings  # type: ignore[return-value]
+
     async def get(self) -> SettingsDto:
+        settings = self.identity_map.get(SettingsDto, None)
+        if settings is None:
+            settings = await self._get_snapshot()
+            self.identity_map.set(SettingsDto, None, settings)
+
+        return settings
+
+    async def _get_snapshot(self) -> SettingsDto:
+        settings = settings_snapshot.get()
+
+        if settings is not None:
+            if not settings_snapshot.is_fresh():
+                settings_snapshot.revalidate_in_background(self.redis_repository)
+            return settings
+
+        # Version is read first, so the stored value is never older than its version
+        version = await self.redis_repository.get_counter(SettingsVersionKey())
+        settings = await self._get()
+        settings_snapshot.store(settings, version)
+        return settings
+
+    @redis_cache(
+        prefix=SETTINGS_CACHE_PREFIX,
+        ttl=TIME_10M,
+        early_refresh=1.0,
+        serializer=MsgpackCacheSerializer,
+    )
+    async def _get(self) -> SettingsDto:
         db_settings = await self.uow.repository.settings.get()
         if not db_settings:
             return await self.create()
@@ -66,6 +167,8 @@ class SettingsService(BaseService):
 
         changed_data = settings.prepare_changed_data()
         db_updated_settings = await self.uow.repository.settings.update(**changed_data)
+        # Readers that refill the cache after the version bump must see the committed row
+        await self.uow.commit()
         await self._clear_cache()
 
         if changed_data:
@@ -73,7 +176,9 @@ class SettingsService(BaseService):
         else:
             logger.warning("Settings update called, but no fields were actually changed")
 
-        return SettingsDto.from_model(db_updated_settings)  # type: ignore[return-value]
+        updated_settings = SettingsDto.from_model(db_updated_settings)
+        self.identity_map.set(SettingsDto, None, updated_settings)
+        return updated_settings  # type: ignore[return-value]
 
     #
 
@@ -178,6 +283,10 @@ class SettingsService(BaseService):
     #
 
     async def _clear_cache(self) -> None:
-        settings_cache_key: str = build_key("cache", "get_settings")
-        logger.debug(f"Cache '{settings_cache_key}' cleared")
-        await self.redis_client.delete(settings_cache_key)
+        self.identity_map.discard(SettingsDto, None)
+        settings_snapshot.invalidate()
+
+        settings_cache_key: str = build_key("cache", SETTINGS_CACHE_PREFIX)
+        await invalidate_cache(self.redis_client, settings_cache_key)
+        version = await self.redis_repository.increment(SettingsVersionKey())
+        logger.debug(f"Cache '{settings_cache_key}' cleared, settings version is now '{version}'")
@@ -0,0 +1,122 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Optional
+
+from aiogram import Bot
+from fluentogram import TranslatorHub
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.config import AppConfig
+from src.core.constants import STATISTICS_REROLL_DAYS, STATISTICS_ROLLUP_OVERLAP
+from src.core.enums import Currency, PaymentGatewayType
+from src.core.utils.time import datetime_now
+from src.infrastructure.database import UnitOfWork
+from src.infrastructure.database.models.sql import (
+    BaseSql,
+    ReferralReward,
+    Subscription,
+    Transaction,
+    User,
+)
+from src.infrastructure.redis import RedisRepository
+
+from .base import BaseService
+
+RollupCallback = Callable[[Optional[datetime], Optional[date]], Awaitable[None]]
+
+
+class StatisticsService(BaseService):
+    uow: UnitOfWork
+
+    def __init__(
+        self,
+        config: AppConfig,
+        bot: Bot,
+        redis_client: Redis,
+        redis_repository: RedisRepository,
+        translator_hub: TranslatorHub,
+        #
+        uow: UnitOfWork,
+    ) -> None:
+        super().__init__(config, bot, redis_client, redis_repository, translator_hub)
+        self.uow = uow
+
+    async def get_users_statistics(self) -> dict[str, int]:
+        now = datetime_now()
+        statistics = await self.uow.replica.statistics.get_users_summary(now)
+        statistics.update(await self.uow.replica.statistics.get_new_users(now))
+        statistics["paying_users"] = await self.uow.replica.statistics.count_paying_users()
+        logger.debug(f"Aggregated users statistics: {statistics}")
+        return statistics
+
+    async def get_transactions_statistics(
+        self,
+    ) -> tuple[dict[str, int], dict[PaymentGatewayType, dict[str, Any]]]:
+        now = datetime_now()
+        summary = await self.uow.replica.statistics.get_transactions_summary()
+        gateways = await self.uow.replica.statistics.get_gateways_income(now)
+        logger.debug(f"Aggregated transactions statistics for '{len(gateways)}' gateways")
+        return summary, gateways
+
+    async def get_subscriptions_statistics(self) -> dict[str, int]:
+        now = datetime_now()
+        statistics = await self.uow.replica.statistics.get_subscriptions_summary(now)
+        logger.debug(f"Aggregated subscriptions statistics: {statistics}")
+        return statistics
+
+    async def get_plans_statistics(
+        self,
+    ) -> tuple[dict[int, dict[str, Any]], dict[int, dict[Currency, Decimal]]]:
+        now = datetime_now()
+        plans: dict[int, dict[str, Any]] = {}
+
+        rows = await self.uow.replica.statistics.get_plans_subscriptions(now)
+
+        for plan_id, duration, total, active in rows:
+            stats = plans.setdefault(plan_id, {"total": 0, "active": 0, "durations": {}})
+            stats["total"] += total
+            stats["active"] += active
+            stats["durations"][duration] = total
+
+        incomes: dict[int, dict[Currency, Decimal]] = {}
+        for plan_id, currency, income in await self.uow.replica.statistics.get_plans_income():
+            incomes.setdefault(plan_id, {})[currency] = income
+
+        logger.debug(f"Aggregated statistics for '{len(plans)}' plans")
+        return plans, incomes
+
+    async def rollup(self, reroll_recent: bool = False) -> None:
+        now = datetime_now()
+        repository = self.uow.repository.statistics
+        # Only a re-roll notices deletes, and only within the last STATISTICS_REROLL_DAYS
+        recent_from = now.date() - timedelta(days=STATISTICS_REROLL_DAYS) if reroll_recent else None
+        sources: dict[str, tuple[type[BaseSql], RollupCallback]] = {
+            "users": (User, repository.rollup_users),
+            "subscriptions": (Subscription, repository.rollup_subscriptions),
+            "transactions": (Transaction, repository.rollup_transactions),
+            "referral_rewards": (ReferralReward, repository.rollup_referral_rewards),
+        }
+
+        for source, (model, rollup) in sources.items():
+            watermark = await repository.get_watermark(source)
+            last_change = await repository.get_last_change(model)
+
+            if last_change is None and recent_from is None:
+                logger.debug(f"No rows in '{source}' to roll up")
+                continue
+
+            # Rows committed late may carry an older `updated_at`, recomputing a day is idempotent
+            since = watermark - timedelta(seconds=STATISTICS_ROLLUP_OVERLAP) if watermark else None
+            await rollup(since, recent_from)
+
+            if last_change is not None and (watermark is None or last_change > watermark):
+                await repository.set_watermark(source, last_change)
+
+            logger.debug(
+                f"Rolled up '{source}' changes since '{since}' up to '{last_change}', "
+                f"recent days from '{recent_from}'"
+            )
+
+        await repository.snapshot_subscriptions(now.date(), now)
+        await self.uow.commit()
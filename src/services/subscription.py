@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional, TypeVar, Union
+from typing import Final, Iterable, Optional, TypeVar, Union
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
@@ -22,14 +22,22 @@ from src.infrastructure.database.models.dto import (
     UserDto,
 )
 from src.infrastructure.database.models.sql import Subscription
-from src.infrastructure.redis import RedisRepository
-from src.infrastructure.redis.cache import redis_cache
+from src.infrastructure.redis import (
+    RedisRepository,
+    get_cached_many,
+    invalidate_cache,
+    redis_cache,
+    set_cached_many,
+)
+from src.infrastructure.redis.serializers import MsgpackCacheSerializer
 from src.services.user import UserService
 
 from .base import BaseService
 
 T = TypeVar("T", SubscriptionDto, RemnaSubscriptionDto)
 
+CURRENT_SUBSCRIPTION_CACHE_PREFIX: Final[str] = "get_current_subscription"
+
 
 class SubscriptionService(BaseService):
     uow: UnitOfWork
@@ -67,7 +75,33 @@ class SubscriptionService(BaseService):
         logger.info(f"Created subscription '{db_subscription.id}' for user '{user.telegram_id}'")
         return SubscriptionDto.from_model(db_created_subscription)  # type: ignore[return-value]
 
-    @redis_cache(prefix="get_subscription", ttl=TIME_5M)
+    async def create_many(self, subscriptions: list[tuple[int, SubscriptionDto]]) -> list[int]:
+        rows = []
+        for telegram_id, subscription in subscriptions:
+            data = subscription.model_dump(exclude={"id", "user", "created_at", "updated_at"})
+            data["plan"] = subscription.plan.model_dump(mode="json")
+            data["user_telegram_id"] = telegram_id
+            rows.append(data)
+
+        subscription_ids = await self.uow.repository.subscriptions.create_many(rows)
+        await self.uow.repository.users.set_current_subscriptions(subscription_ids)
+        await self.uow.commit()
+
+        telegram_ids = [telegram_id for telegram_id, _ in subscriptions]
+        await self.user_service.clear_users_cache(
+            telegram_ids,
+            changed_fields=["current_subscription_id"],
+            related_keys=[
+                key
+                for telegram_id, subscription_id in zip(telegram_ids, subscription_ids)
+                for key in self._get_cache_keys(subscription_id, telegram_id)
+            ],
+        )
+
+        logger.info(f"Created '{len(subscription_ids)}' subscriptions")
+        return subscription_ids
+
+    @redis_cache(prefix="get_subscription", ttl=TIME_5M, serializer=MsgpackCacheSerializer)
     async def get(self, subscription_id: int) -> Optional[SubscriptionDto]:
         db_subscription = await self.uow.repository.subscriptions.get(subscription_id)
 
@@ -78,9 +112,14 @@ class SubscriptionService(BaseService):
 
         return SubscriptionDto.from_model(db_subscription)
 
-    @redis_cache(prefix="get_current_subscription", ttl=TIME_1M)
+    @redis_cache(
+        prefix=CURRENT_SUBSCRIPTION_CACHE_PREFIX,
+        ttl=TIME_1M,
+        local_ttl=TIME_1M,
+        serializer=MsgpackCacheSerializer,
+    )
     async def get_current(self, telegram_id: int) -> Optional[SubscriptionDto]:
-        db_user = await self.uow.repository.users.get(telegram_id)
+        db_user = await self.uow.repository.users.get(telegram_id, profile="bare")
 
         if not db_user or not db_user.current_subscription_id:
             logger.debug(
@@ -104,13 +143,47 @@ class SubscriptionService(BaseService):
 
         return SubscriptionDto.from_model(db_active_subscription)
 
+    async def get_current_many(
+        self,
+        telegram_ids: Iterable[int],
+    ) -> dict[int, Optional[SubscriptionDto]]:
+        telegram_ids = list(dict.fromkeys(telegram_ids))
+        subscriptions: dict[int, Optional[SubscriptionDto]] = await get_cached_many(
+            self.redis_client,
+            CURRENT_SUBSCRIPTION_CACHE_PREFIX,
+            telegram_ids,
+        )
+        missing_ids = [
+            telegram_id for telegram_id in telegram_ids if telegram_id not in subscriptions
+        ]
+
+        if missing_ids:
+            db_subscriptions = await self.uow.repository.subscriptions.get_current_by_users(
+                missing_ids
+            )
+            loaded_subscriptions = {
+                db_subscription.user_telegram_id: SubscriptionDto.from_model(db_subscription)
+                for db_subscription in db_subscriptions
+            }
+            loaded = {
+                telegram_id: loaded_subscriptions.get(telegram_id) for telegram_id in missing_ids
+            }
+            await set_cached_many(self.redis_client, CURRENT_SUBSCRIPTION_CACHE_PREFIX, loaded)
+            subscriptions.update(loaded)
+
+        logger.debug(
+            f"Retrieved current subscriptions for '{len(telegram_ids)}' users in batch, "
+            f"'{len(missing_ids)}' loaded from DB"
+        )
+        return subscriptions
+
     async def get_all_by_user(self, telegram_id: int) -> list[SubscriptionDto]:
         db_subscriptions = await self.uow.repository.subscriptions.get_all_by_user(telegram_id)
         logger.debug(f"Retrieved '{len(db_subscriptions)}' subscriptions for user '{telegram_id}'")
         return SubscriptionDto.from_model_list(db_subscriptions)
 
     async def get_all(self) -> list[SubscriptionDto]:
-        db_subscriptions = await self.uow.repository.subscriptions.get_all()
+        db_subscriptions = await self.uow.replica.subscriptions.get_all()
         logger.debug(f"Retrieved '{len(db_subscriptions)}' total subscriptions")
         return SubscriptionDto.from_model_list(db_subscriptions)
 
@@ -154,15 +227,18 @@ class SubscriptionService(BaseService):
         return count > 0
 
     async def clear_subscription_cache(self, subscription_id: int, user_telegram_id: int) -> None:
-        list_cache_keys_to_invalidate = [
+        list_cache_keys_to_invalidate = self._get_cache_keys(subscription_id, user_telegram_id)
+        await invalidate_cache(self.redis_client, *list_cache_keys_to_invalidate)
+        logger.debug(f"Cache for subscription '{subscription_id}' invalidated")
+
+    @staticmethod
+    def _get_cache_keys(subscription_id: int, user_telegram_id: int) -> list[str]:
+        return [
             build_key("cache", "get_subscription", subscription_id),
-            build_key("cache", "get_current_subscription", user_telegram_id),
+            build_key("cache", CURRENT_SUBSCRIPTION_CACHE_PREFIX, user_telegram_id),
             build_key("cache", "has_used_trial", user_telegram_id),
         ]
 
-        await self.redis_client.delete(*list_cache_keys_to_invalidate)
-        logger.debug(f"Cache for subscription '{subscription_id}' invalidated")
-
     @staticmethod
     def subscriptions_match(
         bot_subscription: Optional[SubscriptionDto],
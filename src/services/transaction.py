@@ -1,3 +1,4 @@
+from datetime import timedelta
 from typing import Optional
 from uuid import UUID
 
@@ -7,7 +8,9 @@ from loguru import logger
 from redis.asyncio import Redis
 
 from src.core.config import AppConfig
+from src.core.constants import MAINTENANCE_CHUNK_SIZE, TRANSACTION_PENDING_TIMEOUT
 from src.core.enums import TransactionStatus
+from src.core.utils.time import datetime_now
 from src.infrastructure.database import UnitOfWork
 from src.infrastructure.database.models.dto import TransactionDto, UserDto
 from src.infrastructure.database.models.sql import Transaction
@@ -58,7 +61,7 @@ class TransactionService(BaseService):
         return TransactionDto.from_model_list(db_transactions)
 
     async def get_all(self) -> list[TransactionDto]:
-        db_transactions = await self.uow.repository.transactions.get_all()
+        db_transactions = await self.uow.replica.transactions.get_all()
         logger.debug(f"Retrieved '{len(db_transactions)}' total transactions")
         return TransactionDto.from_model_list(db_transactions)
 
@@ -92,3 +95,22 @@ class TransactionService(BaseService):
         count = await self.uow.repository.transactions.count_by_status(status)
         logger.debug(f"Transactions count with status '{status}': '{count}'")
         return count
+
+    async def cancel_stale_pending(self) -> int:
+        created_before = datetime_now() - timedelta(seconds=TRANSACTION_PENDING_TIMEOUT)
+        total = 0
+
+        # Chunks are committed one by one to keep row locks short
+        while True:
+            count = await self.uow.repository.transactions.cancel_pending(
+                created_before,
+                limit=MAINTENANCE_CHUNK_SIZE,
+            )
+            await self.uow.commit()
+            total += count
+
+            if count < MAINTENANCE_CHUNK_SIZE:
+                break
+
+        logger.info(f"Canceled '{total}' pending transactions created before '{created_before}'")
+        return total
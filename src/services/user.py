@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Final, Iterable, Optional, Union
 
 from aiogram import Bot
 from aiogram.types import Message
@@ -12,26 +12,58 @@ from src.core.constants import (
     RECENT_ACTIVITY_MAX_COUNT,
     RECENT_REGISTERED_MAX_COUNT,
     REMNASHOP_PREFIX,
+    TIME_1M,
     TIME_5M,
     TIME_10M,
+    USER_SEARCH_PAGE_SIZE,
 )
 from src.core.enums import Locale, UserRole
-from src.core.storage.key_builder import StorageKey, build_key
+from src.core.storage.key_builder import build_key
 from src.core.storage.keys import RecentActivityUsersKey
 from src.core.utils.formatters import format_user_name
 from src.core.utils.generators import generate_referral_code
+from src.core.utils.time import datetime_now
 from src.core.utils.types import RemnaUserDto
-from src.infrastructure.database import UnitOfWork
+from src.infrastructure.database import IdentityMap, UnitOfWork
 from src.infrastructure.database.models.dto import UserDto
-from src.infrastructure.database.models.dto.user import BaseUserDto
+from src.infrastructure.database.models.dto.user import USER_QUERY_FIELDS, BaseUserDto
 from src.infrastructure.database.models.sql import User
-from src.infrastructure.redis import RedisRepository, redis_cache
+from src.infrastructure.database.repositories.user import UserSearchCursor
+from src.infrastructure.redis import (
+    RedisRepository,
+    get_cached_many,
+    invalidate_cache,
+    redis_cache,
+    set_cached_many,
+)
+from src.infrastructure.redis.serializers import MsgpackCacheSerializer
 
 from .base import BaseService
 
+USER_CACHE_PREFIX: Final[str] = "get_user"
+
+USERS_ROLE_TAG: Final[str] = "users:role"
+USERS_BLOCKED_TAG: Final[str] = "users:blocked"
+USERS_COUNT_TAG: Final[str] = "users:count"
+USERS_ALL_TAG: Final[str] = "users:all"
+
+# List caches hold only ids, users are read through their own cache. So a list is stale
+# only when a field that decides its membership changes
+USER_FIELD_TAGS: Final[dict[str, tuple[str, ...]]] = {
+    "role": (USERS_ROLE_TAG,),
+    "is_blocked": (USERS_BLOCKED_TAG,),
+}
+USER_MEMBERSHIP_TAGS: Final[tuple[str, ...]] = (
+    USERS_ROLE_TAG,
+    USERS_BLOCKED_TAG,
+    USERS_COUNT_TAG,
+    USERS_ALL_TAG,
+)
+
 
 class UserService(BaseService):
     uow: UnitOfWork
+    identity_map: IdentityMap
 
     def __init__(
         self,
@@ -42,9 +74,11 @@ class UserService(BaseService):
         translator_hub: TranslatorHub,
         #
         uow: UnitOfWork,
+        identity_map: IdentityMap,
     ) -> None:
         super().__init__(config, bot, redis_client, redis_repository, translator_hub)
         self.uow = uow
+        self.identity_map = identity_map
 
     async def create(self, aiogram_user: AiogramUser) -> UserDto:
         user = UserDto(
@@ -62,35 +96,97 @@ class UserService(BaseService):
                 else self.config.default_locale
             ),
         )
-        db_user = User(**user.model_dump())
+        db_user = User(**user.model_dump(exclude=USER_QUERY_FIELDS))
         db_created_user = await self.uow.repository.users.create(db_user)
         await self.uow.commit()
 
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, membership_changed=True)
         logger.info(f"Created new user '{user.telegram_id}'")
-        return UserDto.from_model(db_created_user)  # type: ignore[return-value]
 
-    async def create_from_panel(self, remna_user: RemnaUserDto) -> UserDto:
-        user = UserDto(
-            telegram_id=remna_user.telegram_id,
-            referral_code=generate_referral_code(
-                remna_user.telegram_id,  # type: ignore[arg-type]
-                secret=self.config.crypt_key.get_secret_value(),
-            ),
-            name=str(remna_user.telegram_id),
-            role=UserRole.USER,
-            language=self.config.default_locale,
+        created_user = UserDto.from_model(db_created_user)
+        created_user = created_user.model_copy(  # type: ignore[union-attr]
+            update={"any_subscription": False, "invited": False}
         )
-        db_user = User(**user.model_dump())
+        self.identity_map.set(UserDto, user.telegram_id, created_user)
+        return created_user
+
+    async def create_from_panel(self, remna_user: RemnaUserDto) -> UserDto:
+        user = self._build_panel_user(remna_user)
+        db_user = User(**user.model_dump(exclude=USER_QUERY_FIELDS))
         db_created_user = await self.uow.repository.users.create(db_user)
         await self.uow.commit()
 
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, membership_changed=True)
         logger.info(f"Created new user '{user.telegram_id}' from panel")
-        return UserDto.from_model(db_created_user)  # type: ignore[return-value]
 
-    @redis_cache(prefix="get_user", ttl=TIME_5M)
+        created_user = UserDto.from_model(db_created_user)
+        created_user = created_user.model_copy(  # type: ignore[union-attr]
+            update={"any_subscription": False, "invited": False}
+        )
+        self.identity_map.set(UserDto, user.telegram_id, created_user)
+        return created_user
+
+    async def create_from_panel_many(self, remna_users: list[RemnaUserDto]) -> list[int]:
+        users = [self._build_panel_user(remna_user) for remna_user in remna_users]
+        await self.uow.repository.users.create_many(
+            [
+                user.model_dump(
+                    exclude={"id", "created_at", "updated_at", "current_subscription"}
+                    | USER_QUERY_FIELDS
+                )
+                for user in users
+            ]
+        )
+        await self.uow.commit()
+
+        telegram_ids = [user.telegram_id for user in users]
+        await self.clear_users_cache(telegram_ids, membership_changed=True)
+        logger.info(f"Created '{len(telegram_ids)}' new users from panel")
+        return telegram_ids
+
     async def get(self, telegram_id: int) -> Optional[UserDto]:
+        if self.identity_map.has(UserDto, telegram_id):
+            return self.identity_map.get(UserDto, telegram_id)
+
+        user = await self._get(telegram_id)
+        self.identity_map.set(UserDto, telegram_id, user)
+        return user
+
+    async def get_many(self, telegram_ids: Iterable[int]) -> list[UserDto]:
+        telegram_ids = list(dict.fromkeys(telegram_ids))
+        users: dict[int, Optional[UserDto]] = {
+            telegram_id: self.identity_map.get(UserDto, telegram_id)
+            for telegram_id in telegram_ids
+            if self.identity_map.has(UserDto, telegram_id)
+        }
+
+        missing_ids = [telegram_id for telegram_id in telegram_ids if telegram_id not in users]
+        users.update(await get_cached_many(self.redis_client, USER_CACHE_PREFIX, missing_ids))
+        missing_ids = [telegram_id for telegram_id in telegram_ids if telegram_id not in users]
+
+        if missing_ids:
+            db_users = await self.uow.repository.users.get_by_ids(missing_ids)
+            loaded_users = {user.telegram_id: user for user in UserDto.from_model_list(db_users)}
+            # Unknown ids are cached as None, the same way `get` caches them
+            loaded = {telegram_id: loaded_users.get(telegram_id) for telegram_id in missing_ids}
+            await set_cached_many(self.redis_client, USER_CACHE_PREFIX, loaded)
+            users.update(loaded)
+
+        for telegram_id, user in users.items():
+            self.identity_map.set(UserDto, telegram_id, user)
+
+        logger.debug(
+            f"Retrieved '{len(users)}' users in batch, '{len(missing_ids)}' loaded from DB"
+        )
+        return [user for telegram_id in telegram_ids if (user := users[telegram_id])]
+
+    @redis_cache(
+        prefix=USER_CACHE_PREFIX,
+        ttl=TIME_5M,
+        local_ttl=TIME_1M,
+        serializer=MsgpackCacheSerializer,
+    )
+    async def _get(self, telegram_id: int) -> Optional[UserDto]:
         db_user = await self.uow.repository.users.get(telegram_id)
 
         if db_user:
@@ -100,14 +196,23 @@ class UserService(BaseService):
 
         return UserDto.from_model(db_user)
 
+    @redis_cache(prefix="get_by_role", ttl=TIME_10M, tags=[USERS_ROLE_TAG])
+    async def _get_ids_by_role(self, role: UserRole) -> list[int]:
+        return await self.uow.repository.users.get_ids_by_role(role)
+
+    @redis_cache(prefix="get_blocked_users", ttl=TIME_10M, tags=[USERS_BLOCKED_TAG])
+    async def _get_blocked_ids(self) -> list[int]:
+        return await self.uow.repository.users.get_blocked_ids()
+
     async def update(self, user: UserDto) -> Optional[UserDto]:
+        changed_data = user.prepare_changed_data()
         db_updated_user = await self.uow.repository.users.update(
             telegram_id=user.telegram_id,
-            **user.prepare_changed_data(),
+            **changed_data,
         )
 
         if db_updated_user:
-            await self.clear_user_cache(db_updated_user.telegram_id)
+            await self.clear_user_cache(db_updated_user.telegram_id, changed_data.keys())
             logger.info(f"Updated user '{user.telegram_id}' successfully")
         else:
             logger.warning(
@@ -115,7 +220,12 @@ class UserService(BaseService):
                 f"but user was not found or update failed"
             )
 
-        return UserDto.from_model(db_updated_user)
+        updated_user = UserDto.from_model(db_updated_user)
+        if updated_user:
+            # RETURNING carries no computed flags, and a column update never changes them
+            updated_user = updated_user.with_flags_of(user)
+            self.identity_map.set(UserDto, updated_user.telegram_id, updated_user)
+        return updated_user
 
     async def compare_and_update(
         self,
@@ -159,76 +269,103 @@ class UserService(BaseService):
         result = await self.uow.repository.users.delete(user.telegram_id)
 
         if result:
-            await self.clear_user_cache(user.telegram_id)
+            await self.clear_user_cache(user.telegram_id, membership_changed=True)
             await self._remove_from_recent_activity(user.telegram_id)
 
         logger.info(f"Deleted user '{user.telegram_id}': '{result}'")
         return result
 
-    async def get_by_partial_name(self, query: str) -> list[UserDto]:
-        db_users = await self.uow.repository.users.get_by_partial_name(query)
-        logger.debug(f"Retrieved '{len(db_users)}' users for query '{query}'")
-        return UserDto.from_model_list(db_users)
+    async def search_by_name(
+        self,
+        query: str,
+        after: Optional[UserSearchCursor] = None,
+        limit: int = USER_SEARCH_PAGE_SIZE,
+    ) -> tuple[list[UserDto], Optional[UserSearchCursor]]:
+        rows = await self.uow.replica.users.search_by_name(query, limit=limit + 1, after=after)
+        page = rows[:limit]
+        next_cursor = None
+
+        if len(rows) > limit:
+            last_user, last_rank = page[-1]
+            next_cursor = (last_rank, last_user.telegram_id)
+
+        logger.debug(
+            f"Retrieved '{len(page)}' users for query '{query}' after '{after}', "
+            f"next cursor '{next_cursor}'"
+        )
+        return UserDto.from_model_list([user for user, _ in page]), next_cursor
 
     async def get_by_referral_code(self, referral_code: str) -> Optional[UserDto]:
         user = await self.uow.repository.users.get_by_referral_code(referral_code)
         return UserDto.from_model(user)
 
-    @redis_cache(prefix="users_count", ttl=TIME_10M)
+    @redis_cache(prefix="users_count", ttl=TIME_10M, tags=[USERS_COUNT_TAG])
     async def count(self) -> int:
         count = await self.uow.repository.users.count()
         logger.debug(f"Total users count: '{count}'")
         return count
 
-    @redis_cache(prefix="get_by_role", ttl=TIME_10M)
     async def get_by_role(self, role: UserRole) -> list[UserDto]:
-        db_users = await self.uow.repository.users.filter_by_role(role)
-        logger.debug(f"Retrieved '{len(db_users)}' users with role '{role}'")
-        return UserDto.from_model_list(db_users)
+        users = await self.get_many(await self._get_ids_by_role(role))
+        logger.debug(f"Retrieved '{len(users)}' users with role '{role}'")
+        return users
 
-    @redis_cache(prefix="get_blocked_users", ttl=TIME_10M)
     async def get_blocked_users(self) -> list[UserDto]:
-        db_users = await self.uow.repository.users.filter_by_blocked(blocked=True)
-        logger.debug(f"Retrieved '{len(db_users)}' blocked users")
-        return UserDto.from_model_list(list(reversed(db_users)))
+        users = await self.get_many(await self._get_blocked_ids())
+        logger.debug(f"Retrieved '{len(users)}' blocked users")
+        return users
 
-    @redis_cache(prefix="get_all", ttl=TIME_10M)
     async def get_all(self) -> list[UserDto]:
-        db_users = await self.uow.repository.users.get_all()
-        logger.debug(f"Retrieved '{len(db_users)}' users")
-        return UserDto.from_model_list(db_users)
+        users = await self.get_many(await self.get_all_ids())
+        logger.debug(f"Retrieved '{len(users)}' users")
+        return users
+
+    @redis_cache(prefix="get_all_ids", ttl=TIME_10M, tags=[USERS_ALL_TAG])
+    async def get_all_ids(self) -> list[int]:
+        return await self.uow.repository.users.get_all_ids()
 
     async def set_block(self, user: UserDto, blocked: bool) -> None:
         user.is_blocked = blocked
+        changed_data = user.prepare_changed_data()
         await self.uow.repository.users.update(
             user.telegram_id,
-            **user.prepare_changed_data(),
+            load_result=False,
+            **changed_data,
         )
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, changed_data.keys())
         logger.info(f"Set block={blocked} for user '{user.telegram_id}'")
 
     async def set_bot_blocked(self, user: UserDto, blocked: bool) -> None:
         user.is_bot_blocked = blocked
+        changed_data = user.prepare_changed_data()
         await self.uow.repository.users.update(
             user.telegram_id,
-            **user.prepare_changed_data(),
+            load_result=False,
+            **changed_data,
         )
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, changed_data.keys())
         logger.info(f"Set bot_blocked={blocked} for user '{user.telegram_id}'")
 
     async def set_role(self, user: UserDto, role: UserRole) -> None:
         user.role = role
+        changed_data = user.prepare_changed_data()
         await self.uow.repository.users.update(
             user.telegram_id,
-            **user.prepare_changed_data(),
+            load_result=False,
+            **changed_data,
         )
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, changed_data.keys())
         logger.info(f"Set role='{role.name}' for user '{user.telegram_id}'")
 
     #
 
     async def update_recent_activity(self, telegram_id: int) -> None:
-        await self._add_to_recent_activity(RecentActivityUsersKey(), telegram_id)
+        await self.redis_repository.sorted_collection_add_capped(
+            key=RecentActivityUsersKey(),
+            mapping={telegram_id: datetime_now().timestamp()},
+            max_size=RECENT_ACTIVITY_MAX_COUNT,
+        )
+        logger.debug(f"User '{telegram_id}' activity updated in recent cache")
 
     async def get_recent_registered_users(self) -> list[UserDto]:
         db_users = await self.uow.repository.users._get_many(
@@ -241,28 +378,32 @@ class UserService(BaseService):
         return UserDto.from_model_list(list(reversed(db_users)))
 
     async def get_recent_activity_users(self, excluded_ids: list[int] = []) -> list[UserDto]:
-        telegram_ids = await self._get_recent_activity()
-        users: list[UserDto] = []
-
-        for telegram_id in telegram_ids:
-            if telegram_id in excluded_ids:
-                continue
+        telegram_ids = [
+            telegram_id
+            for telegram_id in await self._get_recent_activity()
+            if telegram_id not in excluded_ids
+        ]
+        # Cached users come from one MGET over their explicit keys, the rest from one query
+        users = await self.get_many(telegram_ids)
 
-            user = await self.get(telegram_id)
+        found_ids = {user.telegram_id for user in users}
+        missing_ids = [telegram_id for telegram_id in telegram_ids if telegram_id not in found_ids]
 
-            if user:
-                users.append(user)
-            else:
-                logger.warning(
-                    f"User '{telegram_id}' not found in DB, removing from recent activity cache"
-                )
-                await self._remove_from_recent_activity(telegram_id)
+        if missing_ids:
+            logger.warning(
+                f"Users '{missing_ids}' not found in DB, removing from recent activity cache"
+            )
+            await self._remove_from_recent_activity(*missing_ids)
 
         logger.debug(f"Retrieved '{len(users)}' recent active users")
         return users
 
-    async def search_users(self, message: Message) -> list[UserDto]:
+    async def search_users(
+        self,
+        message: Message,
+    ) -> tuple[list[UserDto], Optional[UserSearchCursor]]:
         found_users = []
+        next_cursor = None
 
         if message.forward_from and not message.forward_from.is_bot:
             target_telegram_id = message.forward_from.id
@@ -305,79 +446,105 @@ class UserService(BaseService):
                     logger.warning(f"Failed to parse Remnashop ID from query '{search_query}'")
 
             else:
-                found_users = await self.get_by_partial_name(query=search_query)
+                found_users, next_cursor = await self.search_by_name(query=search_query)
                 logger.info(
                     f"Searched users by partial name '{search_query}', "
                     f"found '{len(found_users)}' users"
                 )
 
-        return found_users
+        return found_users, next_cursor
 
     async def set_current_subscription(self, telegram_id: int, subscription_id: int) -> None:
         await self.uow.repository.users.update(
             telegram_id=telegram_id,
             current_subscription_id=subscription_id,
+            load_result=False,
         )
-        await self.clear_user_cache(telegram_id)
+        await self.clear_user_cache(telegram_id, ["current_subscription_id"])
         logger.info(f"Set current_subscription='{subscription_id}' for user '{telegram_id}'")
 
     async def delete_current_subscription(self, telegram_id: int) -> None:
         await self.uow.repository.users.update(
             telegram_id=telegram_id,
             current_subscription_id=None,
+            load_result=False,
         )
-        await self.clear_user_cache(telegram_id)
+        await self.clear_user_cache(telegram_id, ["current_subscription_id"])
         logger.info(f"Delete current subscription for user '{telegram_id}'")
 
     async def add_points(self, user: Union[BaseUserDto, UserDto], points: int) -> None:
         await self.uow.repository.users.update(
             telegram_id=user.telegram_id,
             points=user.points + points,
+            load_result=False,
         )
-        await self.clear_user_cache(user.telegram_id)
+        await self.clear_user_cache(user.telegram_id, ["points"])
         logger.info(f"Add '{points}' points for user '{user.telegram_id}'")
 
     #
 
-    async def clear_user_cache(self, telegram_id: int) -> None:
-        user_cache_key: str = build_key("cache", "get_user", telegram_id)
-        await self.redis_client.delete(user_cache_key)
-        await self._clear_list_caches()
-        logger.debug(f"User cache for '{telegram_id}' invalidated")
+    async def clear_user_cache(
+        self,
+        telegram_id: int,
+        changed_fields: Iterable[str] = (),
+        membership_changed: bool = False,
+    ) -> None:
+        if membership_changed:
+            tags = set(USER_MEMBERSHIP_TAGS)
+        else:
+            tags = {tag for field in changed_fields for tag in USER_FIELD_TAGS.get(field, ())}
+
+        self.identity_map.discard(UserDto, telegram_id)
+        user_cache_key: str = build_key("cache", USER_CACHE_PREFIX, telegram_id)
+        await invalidate_cache(self.redis_client, user_cache_key, tags=tags)
+        logger.debug(f"User cache for '{telegram_id}' invalidated (tags={sorted(tags)})")
 
-    async def _clear_list_caches(self) -> None:
-        list_cache_keys_to_invalidate = [
-            build_key("cache", "get_blocked_users"),
-            build_key("cache", "count"),
-        ]
+    async def clear_users_cache(
+        self,
+        telegram_ids: Iterable[int],
+        changed_fields: Iterable[str] = (),
+        membership_changed: bool = False,
+        related_keys: Iterable[str] = (),
+    ) -> None:
+        if membership_changed:
+            tags = set(USER_MEMBERSHIP_TAGS)
+        else:
+            tags = {tag for field in changed_fields for tag in USER_FIELD_TAGS.get(field, ())}
 
-        for role in UserRole:
-            key = build_key("cache", "get_by_role", role=role)
-            list_cache_keys_to_invalidate.append(key)
+        # Keys of other caches invalidated by the same change go out in the same call
+        cache_keys: list[str] = list(related_keys)
 
-        await self.redis_client.delete(*list_cache_keys_to_invalidate)
-        logger.debug("List caches invalidated")
+        for telegram_id in telegram_ids:
+            self.identity_map.discard(UserDto, telegram_id)
+            cache_keys.append(build_key("cache", USER_CACHE_PREFIX, telegram_id))
 
-    async def _add_to_recent_activity(self, key: StorageKey, telegram_id: int) -> None:
-        await self.redis_repository.list_remove(key, value=telegram_id, count=0)
-        await self.redis_repository.list_push(key, telegram_id)
-        await self.redis_repository.list_trim(key, start=0, end=RECENT_ACTIVITY_MAX_COUNT - 1)
-        logger.debug(f"User '{telegram_id}' activity updated in recent cache")
+        await invalidate_cache(self.redis_client, *cache_keys, tags=tags)
+        logger.debug(f"Cache for '{len(cache_keys)}' keys invalidated (tags={sorted(tags)})")
 
-    async def _remove_from_recent_activity(self, telegram_id: int) -> None:
-        await self.redis_repository.list_remove(
-            key=RecentActivityUsersKey(),
-            value=telegram_id,
-            count=0,
+    def _build_panel_user(self, remna_user: RemnaUserDto) -> UserDto:
+        return UserDto(
+            telegram_id=remna_user.telegram_id,
+            referral_code=generate_referral_code(
+                remna_user.telegram_id,  # type: ignore[arg-type]
+                secret=self.config.crypt_key.get_secret_value(),
+            ),
+            name=str(remna_user.telegram_id),
+            role=UserRole.USER,
+            language=self.config.default_locale,
+        )
+
+    async def _remove_from_recent_activity(self, *telegram_ids: int) -> None:
+        await self.redis_repository.sorted_collection_remove(
+            RecentActivityUsersKey(),
+            *telegram_ids,
         )
-        logger.debug(f"User '{telegram_id}' removed from recent activity cache")
+        logger.debug(f"Users '{list(telegram_ids)}' removed from recent activity cache")
 
     async def _get_recent_activity(self) -> list[int]:
-        telegram_ids_str = await self.redis_repository.list_range(
-            key=RecentActivityUsersKey(),
+        telegram_ids = await self.redis_repository.sorted_collection_revrange(
+            RecentActivityUsersKey(),
             start=0,
             end=RECENT_ACTIVITY_MAX_COUNT - 1,
         )
-        ids = [int(uid) for uid in telegram_ids_str]
-        logger.debug(f"Retrieved '{len(ids)}' recent activity user IDs from cache")
-        return ids
+        logger.debug(f"Retrieved '{len(telegram_ids)}' recent activity user IDs from cache")
+        return [int(telegram_id) for telegram_id in telegram_ids]
@@ -80,11 +80,10 @@ class WebhookService(BaseService):
 
     async def _clear(self, bot_id: int) -> None:
         key: WebhookLockKey = WebhookLockKey(bot_id=bot_id, webhook_hash="*")
-        keys: list[bytes] = await self.redis_repository.client.keys(key.pack())
+        deleted_count = await self.redis_repository.delete_by_pattern(key.pack())
 
-        if not keys:
+        if not deleted_count:
             logger.debug(f"No webhook lock keys to clear for bot '{bot_id}'")
             return
 
-        await self.redis_repository.client.delete(*keys)
-        logger.debug(f"Cleared '{len(keys)}' webhook lock keys for bot '{bot_id}'")
+        logger.debug(f"Cleared '{deleted_count}' webhook lock keys for bot '{bot_id}'")
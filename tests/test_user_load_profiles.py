@@ -0,0 +1,198 @@
+import asyncio
+import os
+from datetime import timedelta
+from typing import Any, Optional
+from uuid import uuid4
+
+import pytest
+
+TEST_DATABASE_DSN: Optional[str] = os.getenv("TEST_DATABASE_DSN")
+
+if not TEST_DATABASE_DSN:
+    pytest.skip(
+        "TEST_DATABASE_DSN is not set (postgresql+asyncpg://... of a throwaway database)",
+        allow_module_level=True,
+    )
+
+from remnapy.enums import TrafficLimitStrategy  # noqa: E402
+from sqlalchemy import event, insert, text, update  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine  # noqa: E402
+
+from src.core.enums import (  # noqa: E402
+    Locale,
+    PlanType,
+    ReferralLevel,
+    SubscriptionStatus,
+    UserRole,
+)
+from src.core.utils.time import datetime_now  # noqa: E402
+from src.infrastructure.database.models.dto import UserDto  # noqa: E402
+from src.infrastructure.database.models.sql import (  # noqa: E402
+    BaseSql,
+    Referral,
+    Subscription,
+    User,
+)
+from src.infrastructure.database.repositories.user import (  # noqa: E402
+    UserLoadProfile,
+    UserRepository,
+)
+
+REFERRER_ID = 1001
+INVITED_ID = 1002
+PLAIN_ID = 1003
+
+EXPECTED_STATEMENTS: dict[UserLoadProfile, int] = {
+    "bare": 1,
+    "with_current_subscription": 1,
+    "full": 3,
+}
+
+
+def user_row(telegram_id: int) -> dict[str, Any]:
+    return {
+        "telegram_id": telegram_id,
+        "referral_code": f"code{telegram_id}",
+        "name": f"user{telegram_id}",
+        "role": UserRole.USER,
+        "language": Locale.EN,
+        "personal_discount": 0,
+        "purchase_discount": 0,
+        "points": 0,
+        "is_blocked": False,
+        "is_bot_blocked": False,
+        "is_rules_accepted": True,
+    }
+
+
+async def seed(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        # users and subscriptions reference each other, drop_all can't order them
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+        await conn.run_sync(BaseSql.metadata.create_all)
+
+        await conn.execute(
+            insert(User),
+            [user_row(REFERRER_ID), user_row(INVITED_ID), user_row(PLAIN_ID)],
+        )
+        subscription_id = await conn.scalar(
+            insert(Subscription)
+            .values(
+                user_remna_id=uuid4(),
+                user_telegram_id=INVITED_ID,
+                status=SubscriptionStatus.ACTIVE,
+                is_trial=False,
+                traffic_limit=0,
+                device_limit=1,
+                traffic_limit_strategy=TrafficLimitStrategy.NO_RESET,
+                internal_squads=[],
+                expire_at=datetime_now() + timedelta(days=30),
+                url="",
+                plan={
+                    "id": 1,
+                    "name": "Plan",
+                    "type": PlanType.UNLIMITED,
+                    "traffic_limit": 0,
+                    "device_limit": 1,
+                    "duration": 30,
+                    "internal_squads": [],
+                },
+            )
+            .returning(Subscription.id)
+        )
+        await conn.execute(
+            update(User)
+            .where(User.telegram_id == INVITED_ID)
+            .values(current_subscription_id=subscription_id)
+        )
+        await conn.execute(
+            insert(Referral).values(
+                referrer_telegram_id=REFERRER_ID,
+                referred_telegram_id=INVITED_ID,
+                level=ReferralLevel.FIRST,
+            )
+        )
+
+
+async def load(
+    telegram_ids: list[int],
+    profile: UserLoadProfile,
+) -> tuple[list[UserDto], list[str]]:
+    assert TEST_DATABASE_DSN
+    engine = create_async_engine(TEST_DATABASE_DSN)
+    statements: list[str] = []
+
+    def count(*args: Any) -> None:
+        statements.append(args[2])
+
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            repository = UserRepository(session)
+            event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+            if len(telegram_ids) == 1:
+                db_user = await repository.get(telegram_ids[0], profile=profile)
+                db_users = [db_user] if db_user else []
+            else:
+                db_users = await repository.get_by_ids(telegram_ids, profile=profile)
+
+            event.remove(engine.sync_engine, "before_cursor_execute", count)
+            users = UserDto.from_model_list(db_users)
+    finally:
+        await engine.dispose()
+
+    return users, statements
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database() -> None:
+    assert TEST_DATABASE_DSN
+
+    async def run() -> None:
+        engine = create_async_engine(TEST_DATABASE_DSN)
+        try:
+            await seed(engine)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("profile", list(EXPECTED_STATEMENTS))
+def test_get_statement_count(profile: UserLoadProfile) -> None:
+    users, statements = asyncio.run(load([INVITED_ID], profile))
+
+    assert len(users) == 1
+    assert len(statements) == EXPECTED_STATEMENTS[profile], statements
+
+
+@pytest.mark.parametrize("profile", list(EXPECTED_STATEMENTS))
+def test_get_by_ids_statement_count(profile: UserLoadProfile) -> None:
+    users, statements = asyncio.run(load([REFERRER_ID, INVITED_ID, PLAIN_ID], profile))
+
+    assert len(users) == 3
+    assert len(statements) == EXPECTED_STATEMENTS[profile], statements
+
+
+@pytest.mark.parametrize("profile", ["with_current_subscription", "full"])
+def test_flags_are_loaded(profile: UserLoadProfile) -> None:
+    users, _ = asyncio.run(load([REFERRER_ID, INVITED_ID, PLAIN_ID], profile))
+    by_id = {user.telegram_id: user for user in users}
+
+    assert by_id[INVITED_ID].has_any_subscription
+    assert by_id[INVITED_ID].is_invited_user
+    assert by_id[INVITED_ID].has_subscription
+    assert not by_id[PLAIN_ID].has_any_subscription
+    assert not by_id[PLAIN_ID].is_invited_user
+    assert not by_id[REFERRER_ID].is_invited_user
+
+
+def test_bare_profile_fails_loudly_on_flags() -> None:
+    users, _ = asyncio.run(load([INVITED_ID], "bare"))
+
+    with pytest.raises(ValueError):
+        users[0].has_any_subscription
+
+    with pytest.raises(ValueError):
+        users[0].is_invited_user